@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Decode a Sentio trace recorder dump into a replayable trace.
+
+Feed it the device log (or the bench's stderr) containing the lines logged by
+the `sentio.dump_trace` action, between "TRACE BEGIN" and "TRACE END":
+
+    python3 decode_trace.py device.log > capture.csv
+    ./sentio_replay capture.csv
+
+The CSV uses the sentio_replay format (timestamp_ms,x,y,pressure,id) with the
+calibrated position the device computed appended as cal_x,cal_y; the replay
+harness ignores the extra columns. --binary writes an "SNTR" v2 file instead.
+"""
+import argparse
+import base64
+import re
+import struct
+import sys
+
+# Must match TraceRecord in components/sentio/Sentio.h
+RECORD = struct.Struct("<IhhhBBhh")
+FLAG_TOUCH = 0x01
+FLAG_CALIBRATED = 0x02
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+TRACE_LINE = re.compile(r"TRACE (BEGIN v2 records=(\d+) capacity=(\d+)|END|[A-Za-z0-9+/=]+)\s*$")
+
+
+def read_dump(lines):
+    """Record bytes of the last complete dump in the log, and whether the
+    recorder had wrapped (its oldest frame may be cut short)."""
+    payload, dumps, wrapped = None, [], False
+    for line in lines:
+        match = TRACE_LINE.search(ANSI_ESCAPE.sub("", line))
+        if match is None:
+            continue
+        token = match.group(1)
+        if token.startswith("BEGIN"):
+            payload = bytearray()
+            wrapped = match.group(2) == match.group(3)
+        elif token == "END":
+            if payload is not None:
+                dumps.append((bytes(payload), wrapped))
+            payload = None
+        elif payload is not None:
+            payload += base64.b64decode(token)
+    if not dumps:
+        raise ValueError("no complete TRACE BEGIN ... TRACE END block found")
+    return dumps[-1]
+
+
+def decode(data, wrapped):
+    if len(data) % RECORD.size:
+        raise ValueError(f"dump is {len(data)} bytes, not a multiple of {RECORD.size}")
+    records = [RECORD.unpack_from(data, offset) for offset in range(0, len(data), RECORD.size)]
+    if wrapped and records:
+        # The ring overwrote the start of the oldest frame, drop what is left
+        oldest = records[0][0]
+        records = [r for r in records if r[0] != oldest]
+    return records
+
+
+def write_csv(records, out):
+    out.write("timestamp_ms,x,y,pressure,id,cal_x,cal_y\n")
+    for timestamp, raw_x, raw_y, pressure, touch_id, flags, x, y in records:
+        if not flags & FLAG_TOUCH:
+            out.write(f"{timestamp},,,\n")
+            continue
+        calibrated = f"{x},{y}" if flags & FLAG_CALIBRATED else ","
+        out.write(f"{timestamp},{raw_x},{raw_y},{pressure},{touch_id},{calibrated}\n")
+
+
+def write_binary(records, out):
+    out.write(b"SNTR" + struct.pack("<HH", 2, RECORD.size))
+    for record in records:
+        out.write(RECORD.pack(*record))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", nargs="?", help="log file (default: stdin)")
+    parser.add_argument("--binary", metavar="FILE", help="write an SNTR v2 trace instead of CSV")
+    args = parser.parse_args()
+
+    if args.log:
+        with open(args.log, encoding="utf-8", errors="replace") as f:
+            data, wrapped = read_dump(f)
+    else:
+        data, wrapped = read_dump(sys.stdin)
+    records = decode(data, wrapped)
+
+    if args.binary:
+        with open(args.binary, "wb") as f:
+            write_binary(records, f)
+    else:
+        write_csv(records, sys.stdout)
+    print(f"decoded {len(records)} records", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
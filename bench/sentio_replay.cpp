@@ -0,0 +1,701 @@
+// Host-side trace replay harness for the Sentio pipeline.
+//
+// Builds SmartTouchComponent against the shim in stubs/ and feeds it a
+// recorded touch trace, one source report per trace frame, through loop().
+// Reports the events emitted and the per-frame processing time in ns so
+// regressions in calibration, debounce and gesture handling can be measured
+// on a plain Linux box.
+//
+// Trace formats:
+//   CSV    timestamp_ms,x,y,pressure[,id]   one row per touch point. Rows
+//          sharing a timestamp form one frame; a row with empty x/y
+//          ("120,,,") is a frame with no touch. '#' starts a comment;
+//          the Makefile reads "# options:" and "# expect:" comments.
+//   Binary "SNTR" magic, uint16 version, uint16 record size, then
+//          little-endian records of
+//          {uint32 timestamp_ms, int16 x, int16 y, int16 pressure,
+//           uint8 id, uint8 flags (bit 0 = finger down)}.
+//          Version 1 records are 12 bytes. Version 2 (the on-device trace
+//          recorder, see decode_trace.py) appends int16 calibrated x, y and
+//          flags bit 1; only the first 12 bytes are replayed.
+#include "Sentio.h"
+
+#include <chrono>
+#include <cmath>
+#include <cstring>
+#include <fstream>
+#include <map>
+#include <sstream>
+
+using namespace esphome;
+
+namespace {
+
+struct Frame {
+  uint32_t timestamp_ms;
+  touchscreen::TouchPoints_t points;
+};
+
+// Stands in for the hardware driver Sentio proxies (GT911, CST816, ...)
+class ReplaySource : public touchscreen::Touchscreen {
+public:
+  uint32_t polls() const { return this->polls_; }
+
+  // Polls the driver's update() would have made up to `now`
+  void advance(uint32_t now) {
+    if (this->polling_) {
+      this->poll_time_ += now - this->last_time_;
+      this->polls_ += this->poll_time_ / this->update_interval_;
+      this->poll_time_ %= this->update_interval_;
+    }
+    this->last_time_ = now;
+  }
+
+  void report(const touchscreen::TouchPoints_t &points) {
+    bool was_touched = !this->touches.empty();
+    this->touches = points;
+    for (auto *listener : this->listeners_) {
+      if (!points.empty()) {
+        listener->update(points);
+      } else if (was_touched) {
+        listener->release();
+      }
+    }
+  }
+
+protected:
+  uint32_t polls_{0};
+  uint32_t poll_time_{0};
+  uint32_t last_time_{0};
+};
+
+class BenchSentio : public sentio::SmartTouchComponent {
+public:
+  uint32_t releases() const { return this->releases_; }
+  uint64_t travel() const { return this->travel_; }
+  int32_t peak_speed() const { return this->peak_speed_; }
+#ifdef USE_SENTIO_TRACE
+  uint16_t trace_records() const { return this->trace_count_; }
+#endif
+#ifdef USE_SENTIO_DEBUG_RAW
+  // Frames the raw summary counts, never reset unless it is enabled
+  uint32_t debug_frames() const { return this->debug_frames_; }
+#endif
+
+  // Last point consumers saw of the most recently lifted finger
+  bool lifted() const { return this->lifted_; }
+  const touchscreen::TouchPoint &lift_point() const { return this->lift_point_; }
+
+  // Called after every loop() pass: counts releases, how far the published
+  // points moved (jitter shows up as travel on a still finger) and where
+  // lifted fingers were last seen
+  void observe_output() {
+    if (!this->last_output_.empty() && this->touches.empty())
+      this->releases_++;
+    for (auto &tp : this->published_) {
+      auto prev = this->last_point_.find(tp.id);
+      if (prev != this->last_point_.end())
+        this->travel_ += abs(tp.x - prev->second.x) + abs(tp.y - prev->second.y);
+      this->last_point_[tp.id] = tp;
+    }
+    this->published_.clear();
+    for (auto it = this->last_point_.begin(); it != this->last_point_.end();) {
+      bool down = std::any_of(this->touches.begin(), this->touches.end(),
+                              [&](const touchscreen::TouchPoint &tp) { return tp.id == it->first; });
+      if (down) {
+        ++it;
+        continue;
+      }
+      this->lifted_ = true;
+      this->lift_point_ = it->second;
+      it = this->last_point_.erase(it);
+    }
+    this->last_output_ = this->touches;
+
+    // Peak finger speed as a lambda would read it from the history
+    for (auto &tp : this->touches) {
+      int32_t vx, vy;
+      if (this->get_velocity(tp.id, 50, vx, vy))
+        this->peak_speed_ = std::max(this->peak_speed_, std::max(abs(vx), abs(vy)));
+    }
+  }
+
+protected:
+  uint32_t releases_{0};
+  uint64_t travel_{0};
+  int32_t peak_speed_{0};
+  touchscreen::TouchPoints_t last_output_;
+  std::map<uint8_t, touchscreen::TouchPoint> last_point_;
+  bool lifted_{false};
+  touchscreen::TouchPoint lift_point_;
+};
+
+bool load_csv(const std::string &path, std::vector<Frame> &frames) {
+  std::ifstream in(path);
+  if (!in)
+    return false;
+  std::string line;
+  while (std::getline(in, line)) {
+    auto hash = line.find('#');
+    if (hash != std::string::npos)
+      line.erase(hash);
+    if (line.find_first_not_of(" \t\r") == std::string::npos)
+      continue;
+    std::vector<std::string> fields;
+    std::stringstream ss(line);
+    std::string field;
+    while (std::getline(ss, field, ','))
+      fields.push_back(field);
+    char *end = nullptr;
+    uint32_t ts = strtoul(fields[0].c_str(), &end, 10);
+    if (end == fields[0].c_str())
+      continue; // header row
+    if (frames.empty() || frames.back().timestamp_ms != ts)
+      frames.push_back({ts, {}});
+    if (fields.size() < 3 || fields[1].empty() || fields[2].empty())
+      continue; // no touch in this frame
+    touchscreen::TouchPoint tp;
+    tp.x = int16_t(atoi(fields[1].c_str()));
+    tp.y = int16_t(atoi(fields[2].c_str()));
+    tp.pressure = fields.size() > 3 ? int16_t(atoi(fields[3].c_str())) : 0;
+    tp.id = fields.size() > 4 ? uint8_t(atoi(fields[4].c_str())) : 0;
+    frames.back().points.push_back(tp);
+  }
+  return true;
+}
+
+bool load_binary(const std::string &path, std::vector<Frame> &frames) {
+  std::ifstream in(path, std::ios::binary);
+  if (!in)
+    return false;
+  uint8_t header[8];
+  if (!in.read(reinterpret_cast<char *>(header), sizeof(header)) ||
+      memcmp(header, "SNTR", 4) != 0) {
+    fprintf(stderr, "%s: not a Sentio binary trace\n", path.c_str());
+    return false;
+  }
+  uint16_t record_size = uint16_t(header[6] | (header[7] << 8));
+  if (record_size < 12) {
+    fprintf(stderr, "%s: bad record size %u\n", path.c_str(), record_size);
+    return false;
+  }
+  std::vector<uint8_t> rec(record_size);
+  while (in.read(reinterpret_cast<char *>(rec.data()), record_size)) {
+    uint32_t ts = rec[0] | (rec[1] << 8) | (rec[2] << 16) | (uint32_t(rec[3]) << 24);
+    if (frames.empty() || frames.back().timestamp_ms != ts)
+      frames.push_back({ts, {}});
+    if (!(rec[11] & 0x01))
+      continue;
+    touchscreen::TouchPoint tp;
+    tp.x = int16_t(rec[4] | (rec[5] << 8));
+    tp.y = int16_t(rec[6] | (rec[7] << 8));
+    tp.pressure = int16_t(rec[8] | (rec[9] << 8));
+    tp.id = rec[10];
+    frames.back().points.push_back(tp);
+  }
+  return true;
+}
+
+bool ends_with(const std::string &s, const std::string &suffix) {
+  return s.size() >= suffix.size() &&
+         s.compare(s.size() - suffix.size(), suffix.size(), suffix) == 0;
+}
+
+struct Stats {
+  std::vector<uint64_t> samples;
+
+  void print(const char *label) {
+    if (this->samples.empty()) {
+      printf("%-9s n=0\n", label);
+      return;
+    }
+    std::sort(this->samples.begin(), this->samples.end());
+    uint64_t sum = 0;
+    for (auto s : this->samples)
+      sum += s;
+    size_t n = this->samples.size();
+    printf("%-9s n=%zu min=%llu mean=%llu p50=%llu p99=%llu max=%llu\n", label, n,
+           (unsigned long long) this->samples.front(),
+           (unsigned long long) (sum / n),
+           (unsigned long long) this->samples[n / 2],
+           (unsigned long long) this->samples[std::min(n - 1, n * 99 / 100)],
+           (unsigned long long) this->samples.back());
+  }
+};
+
+// Mirrors orientation_matrix() / compose() / to_fixed() in touchscreen.py
+struct Calibration {
+  double m[2][3]{{1, 0, 0}, {0, 1, 0}};
+  int width, height;
+
+  Calibration(int w, int h, bool swap, bool invert_x, bool invert_y)
+      : width(w), height(h) {
+    if (swap) {
+      this->m[0][0] = 0;
+      this->m[0][1] = 1;
+      this->m[1][0] = 1;
+      this->m[1][1] = 0;
+      std::swap(this->width, this->height);
+    }
+    if (invert_x) {
+      this->m[0][0] = -this->m[0][0];
+      this->m[0][1] = -this->m[0][1];
+      this->m[0][2] = this->width - 1;
+    }
+    if (invert_y) {
+      this->m[1][0] = -this->m[1][0];
+      this->m[1][1] = -this->m[1][1];
+      this->m[1][2] = this->height - 1;
+    }
+  }
+
+  void then(const double outer[6]) {
+    double r[2][3];
+    for (int row = 0; row < 2; row++)
+      for (int col = 0; col < 3; col++)
+        r[row][col] = outer[row * 3] * this->m[0][col] +
+                      outer[row * 3 + 1] * this->m[1][col] +
+                      (col == 2 ? outer[row * 3 + 2] : 0);
+    memcpy(this->m, r, sizeof(r));
+  }
+
+  void apply(sentio::SmartTouchComponent &sentio) const {
+    const double one = 1 << 16;
+    int32_t q[6];
+    for (int i = 0; i < 6; i++)
+      q[i] = int32_t(lround(this->m[i / 3][i % 3] * one));
+    q[2] += 1 << 15;
+    q[5] += 1 << 15;
+    sentio.set_resolution(this->width, this->height);
+    sentio.set_calibration(q[0], q[1], q[2], q[3], q[4], q[5]);
+  }
+};
+
+// Compares the replay with an --expect spec. Triggers the spec doesn't list
+// are expected not to fire, other counters are only checked when listed.
+bool check_expect(const std::string &spec, std::map<std::string, long long> results) {
+  std::map<std::string, long long> expected;
+  for (auto &kv : results) {
+    if (kv.first != "published" && kv.first != "suppressed" && kv.first != "coalesced" &&
+        kv.first != "released" && kv.first != "travel" && kv.first != "ghosts" &&
+        kv.first != "samples" && kv.first != "span" && kv.first != "peak" &&
+        kv.first != "records" && kv.first != "frames" && kv.first != "lift_x" &&
+        kv.first != "lift_y")
+      expected[kv.first] = 0;
+  }
+  std::stringstream ss(spec);
+  std::string item;
+  bool ok = true;
+  while (ss >> item) {
+    auto eq = item.find('=');
+    std::string key = item.substr(0, eq);
+    if (eq == std::string::npos || results.count(key) == 0) {
+      printf("check:     unknown expectation '%s'\n", item.c_str());
+      ok = false;
+      continue;
+    }
+    expected[key] = atoll(item.c_str() + eq + 1);
+  }
+  for (auto &kv : expected) {
+    if (results[kv.first] != kv.second) {
+      printf("check:     FAIL %s=%lld, expected %lld\n", kv.first.c_str(),
+             results[kv.first], kv.second);
+      ok = false;
+    }
+  }
+  if (ok)
+    printf("check:     ok\n");
+  return ok;
+}
+
+void usage(const char *argv0) {
+  fprintf(stderr,
+          "usage: %s [options] TRACE\n"
+          "  --mode poll|interrupt   update mode (default poll)\n"
+          "  --width N --height N    display resolution (default 320x240)\n"
+          "  --swap --invert-x --invert-y\n"
+          "  --matrix A,B,C,D,E,F    extra affine calibration after swap/invert\n"
+          "  --pressure MIN[,REL]    pressure gate with release hysteresis\n"
+          "  --median N              median spike filter over N raw samples (3 or 5)\n"
+          "  --smoothing MIN,BETA,D  One-Euro filter (Hz, Hz per px/s, Hz)\n"
+          "  --debounce MS           debounce threshold (default 20)\n"
+          "  --debounce-mode M       hold or passthrough (default hold)\n"
+          "  --deadband PX           movement deadband (default 0)\n"
+          "  --report-rate HZ        max_report_rate (default every frame)\n"
+          "  --report-average        publish the mean of coalesced samples\n"
+          "  --swipe-threshold PX    swipe distance (default 30)\n"
+          "  --swipe-velocity PX/S   minimum swipe speed (default 0)\n"
+          "  --axis-ratio R          swipe axis lock ratio (default 1.0)\n"
+          "  --tap-max MS            longest tap (default: long press time)\n"
+          "  --long-press MS         long press time (default 800)\n"
+          "  --hold-repeat MS        hold repeat interval (default 200)\n"
+          "  --double-tap MS         enable on_double_tap with this window\n"
+          "  --sleep-timeout MS      sleep timeout (default 30000)\n"
+          "  --no-suppress-wake      do not swallow the wake-up touch\n"
+          "  --sleep-poll MS|never   source update interval while asleep\n"
+          "  --dim MS                idle stage before sleep (counted as dim)\n"
+          "  --idle-passes N         extra loop() passes spread between frames (default 0)\n"
+          "  --iterations N          replay the trace N times (default 1)\n"
+          "  --expect \"K=V ...\"      exit 1 unless the replay gives these counts;\n"
+          "                          events not listed must not fire\n"
+          "  --dump-trace            log the trace recorder after the replay\n"
+          "  --debug-raw N[,change][,summary]\n"
+          "                          raw debug sampling (logged with -vv)\n"
+          "  -v / -vv                component logging\n",
+          argv0);
+}
+
+} // namespace
+
+int main(int argc, char **argv) {
+  std::string trace_path;
+  std::string mode = "poll";
+  std::string debounce_mode = "hold";
+  int width = 320, height = 240;
+  bool swap = false, invert_x = false, invert_y = false, suppress_wake = true;
+  bool has_matrix = false;
+  int median_window = 0, deadband = 0;
+  double report_rate = 0;
+  bool report_average = false;
+  unsigned min_pressure = 0, release_pressure = 0;
+  double smoothing[3] = {0, 0, 0};
+  double matrix[6];
+  uint32_t debounce = 20, sleep_timeout = 30000;
+  int swipe_threshold = 30;
+  uint32_t swipe_velocity = 0, tap_max = 0;
+  uint32_t long_press = 800, hold_repeat = 200, double_tap_window = 0;
+  double axis_ratio = 1.0;
+  int idle_passes = 0, iterations = 1;
+  std::string expect;
+  bool dump_trace = false;
+  uint32_t sleep_poll = 0;
+  uint32_t dim = 0;
+#ifdef USE_SENTIO_DEBUG_RAW
+  uint16_t debug_every = 1;
+  bool debug_on_change = false, debug_summary = false;
+#endif
+
+  for (int i = 1; i < argc; i++) {
+    std::string arg = argv[i];
+    auto next = [&]() -> const char * {
+      if (i + 1 >= argc) {
+        usage(argv[0]);
+        exit(2);
+      }
+      return argv[++i];
+    };
+    if (arg == "--mode")
+      mode = next();
+    else if (arg == "--width")
+      width = atoi(next());
+    else if (arg == "--height")
+      height = atoi(next());
+    else if (arg == "--swap")
+      swap = true;
+    else if (arg == "--invert-x")
+      invert_x = true;
+    else if (arg == "--invert-y")
+      invert_y = true;
+    else if (arg == "--matrix") {
+      has_matrix = sscanf(next(), "%lf,%lf,%lf,%lf,%lf,%lf", &matrix[0], &matrix[1],
+                          &matrix[2], &matrix[3], &matrix[4], &matrix[5]) == 6;
+      if (!has_matrix) {
+        usage(argv[0]);
+        return 2;
+      }
+    } else if (arg == "--pressure") {
+      int n = sscanf(next(), "%u,%u", &min_pressure, &release_pressure);
+      if (n < 1) {
+        usage(argv[0]);
+        return 2;
+      }
+      if (n == 1)
+        release_pressure = min_pressure;
+    } else if (arg == "--median") {
+      median_window = atoi(next());
+      if (median_window != 3 && median_window != 5) {
+        usage(argv[0]);
+        return 2;
+      }
+    } else if (arg == "--smoothing") {
+      if (sscanf(next(), "%lf,%lf,%lf", &smoothing[0], &smoothing[1], &smoothing[2]) != 3) {
+        usage(argv[0]);
+        return 2;
+      }
+    } else if (arg == "--debounce-mode")
+      debounce_mode = next();
+    else if (arg == "--deadband")
+      deadband = atoi(next());
+    else if (arg == "--report-rate")
+      report_rate = atof(next());
+    else if (arg == "--report-average")
+      report_average = true;
+    else if (arg == "--debounce")
+      debounce = strtoul(next(), nullptr, 10);
+    else if (arg == "--swipe-threshold")
+      swipe_threshold = atoi(next());
+    else if (arg == "--swipe-velocity")
+      swipe_velocity = strtoul(next(), nullptr, 10);
+    else if (arg == "--axis-ratio")
+      axis_ratio = atof(next());
+    else if (arg == "--tap-max")
+      tap_max = strtoul(next(), nullptr, 10);
+    else if (arg == "--long-press")
+      long_press = strtoul(next(), nullptr, 10);
+    else if (arg == "--hold-repeat")
+      hold_repeat = strtoul(next(), nullptr, 10);
+    else if (arg == "--double-tap")
+      double_tap_window = strtoul(next(), nullptr, 10);
+    else if (arg == "--sleep-timeout")
+      sleep_timeout = strtoul(next(), nullptr, 10);
+    else if (arg == "--no-suppress-wake")
+      suppress_wake = false;
+    else if (arg == "--dim")
+      dim = strtoul(next(), nullptr, 10);
+    else if (arg == "--sleep-poll") {
+      std::string value = next();
+      sleep_poll = value == "never" ? SCHEDULER_DONT_RUN : strtoul(value.c_str(), nullptr, 10);
+    }
+    else if (arg == "--idle-passes")
+      idle_passes = atoi(next());
+    else if (arg == "--iterations")
+      iterations = atoi(next());
+    else if (arg == "--expect")
+      expect = next();
+    else if (arg == "--dump-trace")
+      dump_trace = true;
+    else if (arg == "--debug-raw") {
+      std::string spec = next();
+#ifdef USE_SENTIO_DEBUG_RAW
+      debug_every = uint16_t(std::max(atoi(spec.c_str()), 1));
+      debug_on_change = spec.find(",change") != std::string::npos;
+      debug_summary = spec.find(",summary") != std::string::npos;
+#else
+      fprintf(stderr, "--debug-raw: built without DEBUG_RAW in FEATURES\n");
+      return 2;
+#endif
+    }
+    else if (arg == "-v")
+      host::log_level() = 1;
+    else if (arg == "-vv")
+      host::log_level() = 2;
+    else if (arg == "-h" || arg == "--help") {
+      usage(argv[0]);
+      return 0;
+    } else if (!arg.empty() && arg[0] == '-') {
+      usage(argv[0]);
+      return 2;
+    } else
+      trace_path = arg;
+  }
+  if (trace_path.empty() || (mode != "poll" && mode != "interrupt") ||
+      dim >= sleep_timeout || (!expect.empty() && iterations != 1)) {
+    usage(argv[0]);
+    return 2;
+  }
+
+  std::vector<Frame> frames;
+  bool ok = ends_with(trace_path, ".csv") ? load_csv(trace_path, frames)
+                                          : load_binary(trace_path, frames);
+  if (!ok || frames.empty()) {
+    fprintf(stderr, "%s: no frames loaded\n", trace_path.c_str());
+    return 1;
+  }
+
+  ReplaySource source;
+  BenchSentio sentio;
+  sentio.set_source_driver(&source);
+  sentio.set_suppress_wake_click(suppress_wake);
+  sentio.set_sleep_update_interval(sleep_poll);
+  Calibration calibration(width, height, swap, invert_x, invert_y);
+  if (has_matrix)
+    calibration.then(matrix);
+  calibration.apply(sentio);
+  sentio.set_pressure_thresholds(min_pressure, release_pressure);
+  sentio.set_median_window(median_window);
+  if (smoothing[0] > 0)
+    sentio.set_smoothing(uint32_t(lround(smoothing[0] * 1000)),
+                         uint32_t(lround(smoothing[1] * 1000000)),
+                         uint32_t(lround(smoothing[2] * 1000)));
+#ifdef USE_SENTIO_DEBUG_RAW
+  sentio.set_debug_raw(debug_every, debug_on_change, debug_summary);
+#endif
+  sentio.set_debounce_threshold(debounce);
+  sentio.set_movement_deadband(deadband);
+  if (report_rate > 0)
+    sentio.set_report_interval(uint32_t(lround(1000 / report_rate)));
+  sentio.set_report_mode(report_average ? sentio::REPORT_MODE_AVERAGE
+                                        : sentio::REPORT_MODE_LATEST);
+  sentio.set_debounce_mode(debounce_mode == "passthrough"
+                               ? sentio::DEBOUNCE_MODE_PASSTHROUGH
+                               : sentio::DEBOUNCE_MODE_HOLD);
+  sentio.set_swipe_threshold(swipe_threshold);
+  sentio.set_swipe_min_velocity(swipe_velocity);
+  sentio.set_swipe_axis_ratio(uint32_t(lround(axis_ratio * 256)));
+  sentio.set_tap_max_duration(tap_max != 0 ? tap_max : long_press);
+  sentio.set_long_press_time(long_press);
+  sentio.set_hold_repeat_interval(hold_repeat);
+  sentio.set_update_mode(mode == "interrupt" ? sentio::UPDATE_MODE_INTERRUPT
+                                             : sentio::UPDATE_MODE_POLL);
+
+  std::map<std::string, Trigger<> *> triggers;
+  for (const char *name :
+       {"on_swipe_left", "on_swipe_right", "on_swipe_up", "on_swipe_down", "on_tap",
+        "on_double_tap", "on_long_press", "on_hold_repeat", "on_wake", "on_sleep"})
+    triggers[name] = new Trigger<>();
+  sentio.set_on_swipe_left(triggers["on_swipe_left"]);
+  sentio.set_on_swipe_right(triggers["on_swipe_right"]);
+  sentio.set_on_swipe_up(triggers["on_swipe_up"]);
+  sentio.set_on_swipe_down(triggers["on_swipe_down"]);
+  sentio.set_on_tap(triggers["on_tap"]);
+  // Setting on_double_tap delays on_tap, so it is opt-in
+  if (double_tap_window > 0) {
+    sentio.set_on_double_tap(triggers["on_double_tap"]);
+    sentio.set_double_tap_window(double_tap_window);
+  }
+  sentio.set_on_long_press(triggers["on_long_press"]);
+  sentio.set_on_hold_repeat(triggers["on_hold_repeat"]);
+  sentio.set_on_wake(triggers["on_wake"]);
+  sentio.set_on_sleep(triggers["on_sleep"]);
+
+  // Idle timeline: optional dim stage, then sleep
+  if (dim > 0) {
+    triggers["on_dim"] = new Trigger<>();
+    sentio.add_idle_stage(dim, sentio::IDLE_STATE_AWAKE, triggers["on_dim"]);
+  }
+  sentio.set_sleep_timeout(sleep_timeout);
+
+  // Two-finger triggers also keep the product of their deltas
+  std::map<std::string, Trigger<int32_t> *> value_triggers;
+  std::map<std::string, double> accumulated;
+  for (const char *name : {"on_pinch", "on_rotate"}) {
+    value_triggers[name] = new Trigger<int32_t>();
+    accumulated[name] = 0;
+  }
+  accumulated["on_pinch"] = 1.0;
+  value_triggers["on_pinch"]->set_callback(
+      [&accumulated](int32_t scale) { accumulated["on_pinch"] *= scale / 256.0; });
+  value_triggers["on_rotate"]->set_callback(
+      [&accumulated](int32_t angle) { accumulated["on_rotate"] += angle / 10.0; });
+  sentio.set_on_pinch(value_triggers["on_pinch"]);
+  sentio.set_on_rotate(value_triggers["on_rotate"]);
+
+  host::set_time_ms(frames.front().timestamp_ms);
+  source.advance(frames.front().timestamp_ms);
+  sentio.setup();
+
+  // Each iteration continues the clock where the previous one stopped
+  uint32_t span = frames.back().timestamp_ms - frames.front().timestamp_ms + 100;
+  Stats frame_ns, idle_ns;
+  frame_ns.samples.reserve(frames.size() * iterations);
+  using clock = std::chrono::steady_clock;
+
+  for (int it = 0; it < iterations; it++) {
+    uint32_t offset = uint32_t(it) * span;
+    for (size_t f = 0; f < frames.size(); f++) {
+      auto &frame = frames[f];
+      host::set_time_ms(frame.timestamp_ms + offset);
+      host::run_scheduler();
+
+      source.advance(frame.timestamp_ms + offset);
+      source.report(frame.points);
+
+      auto t0 = clock::now();
+      sentio.loop();
+      auto t1 = clock::now();
+      frame_ns.samples.push_back(
+          std::chrono::duration_cast<std::chrono::nanoseconds>(t1 - t0).count());
+      sentio.observe_output();
+
+      // Idle passes are spread over the gap to the next frame, as the main
+      // loop keeps running between source reports
+      uint32_t gap = f + 1 < frames.size()
+                         ? frames[f + 1].timestamp_ms - frame.timestamp_ms
+                         : 0;
+      for (int i = 0; i < idle_passes; i++) {
+        host::set_time_ms(frame.timestamp_ms + offset + gap * (i + 1) / (idle_passes + 1));
+        host::run_scheduler();
+        auto i0 = clock::now();
+        sentio.loop();
+        auto i1 = clock::now();
+        idle_ns.samples.push_back(
+            std::chrono::duration_cast<std::chrono::nanoseconds>(i1 - i0).count());
+        sentio.observe_output();
+      }
+    }
+  }
+
+  // Let timers that are still pending (e.g. a tap waiting out the double-tap
+  // window) fire before counting
+  host::clock_us() += 1000 * 1000;
+  host::run_scheduler();
+
+  printf("trace:     %s (%zu frames x %d, mode %s)\n", trace_path.c_str(),
+         frames.size(), iterations, mode.c_str());
+  printf("events:   ");
+  for (auto &kv : triggers)
+    printf(" %s=%u", kv.first.c_str() + 3, kv.second->count());
+  printf(" published=%u suppressed=%u coalesced=%u released=%u travel=%llupx\n",
+         sentio.publish_count(), sentio.get_suppressed_frames(),
+         sentio.get_coalesced_frames(), sentio.releases(),
+         (unsigned long long) sentio.travel());
+  printf("source:    polls=%u (update interval %u ms)\n", source.polls(),
+         source.get_update_interval());
+  // Time the history ring covers, shrinks if frames are recorded twice
+  uint32_t history_span = 0;
+  if (sentio.get_history_count() > 0)
+    history_span = sentio.get_history(0).timestamp -
+                   sentio.get_history(sentio.get_history_count() - 1).timestamp;
+  printf("history:   samples=%u span=%ums peak=%dpx/s (50 ms window)\n",
+         sentio.get_history_count(), history_span, sentio.peak_speed());
+  printf("debounce:  ghosts=%u latency last=%ums max=%ums\n", sentio.get_ghost_touches(),
+         sentio.get_publish_latency(), sentio.get_max_publish_latency());
+  if (sentio.lifted())
+    printf("lift:      last published x=%d y=%d\n", sentio.lift_point().x, sentio.lift_point().y);
+#ifdef USE_SENTIO_TRACE
+  printf("recorder:  records=%u (capacity %u)\n", sentio.trace_records(), SENTIO_TRACE_SIZE);
+#endif
+#ifdef USE_SENTIO_DEBUG_RAW
+  if (!debug_summary)
+    printf("debug raw: frames=%u\n", sentio.debug_frames());
+#endif
+  if (value_triggers["on_pinch"]->count() + value_triggers["on_rotate"]->count() > 0) {
+    printf("gestures:  pinch=%u (x%.2f) rotate=%u (%+.1f deg)\n",
+           value_triggers["on_pinch"]->count(), accumulated["on_pinch"],
+           value_triggers["on_rotate"]->count(), accumulated["on_rotate"]);
+  }
+  frame_ns.print("frame ns");
+  if (idle_passes > 0)
+    idle_ns.print("idle ns");
+  if (dump_trace) {
+    host::log_level() = std::max(host::log_level(), 1);
+    sentio.dump_trace();
+  }
+
+  if (expect.empty())
+    return 0;
+  std::map<std::string, long long> results;
+  for (auto &kv : triggers)
+    results[kv.first.substr(3)] = kv.second->count();
+  results["pinch"] = value_triggers["on_pinch"]->count();
+  results["rotate"] = value_triggers["on_rotate"]->count();
+  results["published"] = sentio.publish_count();
+  results["suppressed"] = sentio.get_suppressed_frames();
+  results["coalesced"] = sentio.get_coalesced_frames();
+  results["released"] = sentio.releases();
+  results["travel"] = sentio.travel();
+  results["ghosts"] = sentio.get_ghost_touches();
+  results["samples"] = sentio.get_history_count();
+  results["span"] = history_span;
+  results["lift_x"] = sentio.lifted() ? sentio.lift_point().x : -1;
+  results["lift_y"] = sentio.lifted() ? sentio.lift_point().y : -1;
+#ifdef USE_SENTIO_TRACE
+  results["records"] = sentio.trace_records();
+#endif
+#ifdef USE_SENTIO_DEBUG_RAW
+  if (!debug_summary)
+    results["frames"] = sentio.debug_frames();
+#endif
+  results["peak"] = sentio.peak_speed();
+  return check_expect(expect, results) ? 0 : 1;
+}
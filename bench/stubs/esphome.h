@@ -0,0 +1,252 @@
+#pragma once
+// Host shim for building the Sentio component outside of ESPHome.
+// Only the pieces of the ESPHome API that Sentio touches are modelled; time,
+// the scheduler and the source driver are driven by the replay harness.
+#include <algorithm>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <functional>
+#include <string>
+#include <utility>
+#include <vector>
+
+// --- Logging ---
+namespace esphome {
+namespace host {
+inline int &log_level() {
+  static int level = 0; // 0 = quiet, 1 = info, 2 = debug
+  return level;
+}
+} // namespace host
+} // namespace esphome
+
+#define ESP_HOST_LOG_(lvl, tag, fmt, ...)                                      \
+  do {                                                                         \
+    if (esphome::host::log_level() >= (lvl))                                   \
+      fprintf(stderr, "[%s] " fmt "\n", tag, ##__VA_ARGS__);                   \
+  } while (0)
+#define ESP_LOGE(tag, fmt, ...) ESP_HOST_LOG_(0, tag, fmt, ##__VA_ARGS__)
+#define ESP_LOGW(tag, fmt, ...) ESP_HOST_LOG_(0, tag, fmt, ##__VA_ARGS__)
+#define ESP_LOGI(tag, fmt, ...) ESP_HOST_LOG_(1, tag, fmt, ##__VA_ARGS__)
+#define ESP_LOGD(tag, fmt, ...) ESP_HOST_LOG_(2, tag, fmt, ##__VA_ARGS__)
+#define ESP_LOGV(tag, fmt, ...) ESP_HOST_LOG_(3, tag, fmt, ##__VA_ARGS__)
+
+namespace esphome {
+
+// --- Clock ---
+namespace host {
+inline uint64_t &clock_us() {
+  static uint64_t now = 0;
+  return now;
+}
+inline void set_time_ms(uint32_t ms) { clock_us() = uint64_t(ms) * 1000; }
+} // namespace host
+
+inline uint32_t millis() { return uint32_t(host::clock_us() / 1000); }
+inline uint32_t micros() { return uint32_t(host::clock_us()); }
+
+// --- Flash access (no PROGMEM on the host) ---
+inline uint8_t progmem_read_byte(const uint8_t *addr) { return *addr; }
+inline uint16_t progmem_read_uint16(const uint16_t *addr) { return *addr; }
+
+// --- Helpers ---
+inline std::string base64_encode(const uint8_t *buf, size_t buf_len) {
+  static const char chars[] =
+      "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/";
+  std::string out;
+  for (size_t i = 0; i < buf_len; i += 3) {
+    uint32_t n = uint32_t(buf[i]) << 16;
+    if (i + 1 < buf_len)
+      n |= uint32_t(buf[i + 1]) << 8;
+    if (i + 2 < buf_len)
+      n |= buf[i + 2];
+    out += chars[(n >> 18) & 63];
+    out += chars[(n >> 12) & 63];
+    out += i + 1 < buf_len ? chars[(n >> 6) & 63] : '=';
+    out += i + 2 < buf_len ? chars[n & 63] : '=';
+  }
+  return out;
+}
+
+// --- Scheduler ---
+class Component;
+
+static const uint32_t SCHEDULER_DONT_RUN = 4294967295UL;
+
+namespace host {
+struct ScheduledItem {
+  Component *owner;
+  std::string name;
+  uint64_t deadline_us;
+  uint32_t interval_ms; // 0 = one-shot timeout
+  std::function<void()> fn;
+};
+
+inline std::vector<ScheduledItem> &scheduler() {
+  static std::vector<ScheduledItem> items;
+  return items;
+}
+
+inline bool cancel(Component *owner, const std::string &name) {
+  auto &items = scheduler();
+  auto it = std::find_if(items.begin(), items.end(), [&](const ScheduledItem &i) {
+    return i.owner == owner && i.name == name;
+  });
+  if (it == items.end())
+    return false;
+  items.erase(it);
+  return true;
+}
+
+inline void schedule(Component *owner, const std::string &name, uint32_t delay_ms,
+                     uint32_t interval_ms, std::function<void()> &&fn) {
+  cancel(owner, name);
+  scheduler().push_back(
+      {owner, name, clock_us() + uint64_t(delay_ms) * 1000, interval_ms, std::move(fn)});
+}
+
+// Run every item that is due at the current clock, earliest first. Each one
+// runs with the clock at its own deadline, so timeouts it schedules start
+// from there rather than from the (later) frame that triggered the run.
+inline void run_scheduler() {
+  auto &items = scheduler();
+  uint64_t now = clock_us();
+  while (true) {
+    auto due = std::min_element(items.begin(), items.end(),
+                                [](const ScheduledItem &a, const ScheduledItem &b) {
+                                  return a.deadline_us < b.deadline_us;
+                                });
+    if (due == items.end() || due->deadline_us > now) {
+      clock_us() = now;
+      return;
+    }
+    clock_us() = due->deadline_us;
+    ScheduledItem item = std::move(*due);
+    items.erase(due);
+    if (item.interval_ms > 0) {
+      ScheduledItem next = item;
+      next.deadline_us += uint64_t(item.interval_ms) * 1000;
+      items.push_back(std::move(next));
+    }
+    item.fn();
+  }
+}
+} // namespace host
+
+class Component {
+public:
+  virtual ~Component() = default;
+  virtual void setup() {}
+  virtual void loop() {}
+
+protected:
+  void set_timeout(const std::string &name, uint32_t timeout,
+                   std::function<void()> &&f) {
+    host::schedule(this, name, timeout, 0, std::move(f));
+  }
+  bool cancel_timeout(const std::string &name) { return host::cancel(this, name); }
+  void set_interval(const std::string &name, uint32_t interval,
+                    std::function<void()> &&f) {
+    host::schedule(this, name, interval, interval, std::move(f));
+  }
+  bool cancel_interval(const std::string &name) { return host::cancel(this, name); }
+};
+
+// --- Automation ---
+template <typename... Ts> class Trigger {
+public:
+  void trigger(Ts... x) {
+    this->count_++;
+    if (this->callback_)
+      this->callback_(x...);
+  }
+  void set_callback(std::function<void(Ts...)> &&cb) {
+    this->callback_ = std::move(cb);
+  }
+  uint32_t count() const { return this->count_; }
+
+protected:
+  uint32_t count_{0};
+  std::function<void(Ts...)> callback_;
+};
+
+template <typename... Ts> class Action {
+public:
+  virtual ~Action() = default;
+  virtual void play(Ts... x) = 0;
+};
+
+// --- Touchscreen ---
+namespace touchscreen {
+
+struct TouchPoint {
+  uint8_t id{0};
+  int16_t x{0}, y{0};
+  int16_t pressure{0};
+};
+using TouchPoints_t = std::vector<TouchPoint>;
+
+class TouchListener {
+public:
+  virtual ~TouchListener() = default;
+  virtual void touch(TouchPoint tp) {}
+  virtual void update(const TouchPoints_t &tpoints) {}
+  virtual void release() {}
+};
+
+class Touchscreen {
+public:
+  virtual ~Touchscreen() = default;
+
+  // Points currently reported to consumers
+  TouchPoints_t touches;
+
+  void register_listener(TouchListener *listener) {
+    this->listeners_.push_back(listener);
+  }
+
+  // PollingComponent side of the real Touchscreen (no scheduler entry, the
+  // harness reads these to count the I2C polls the driver would make)
+  uint32_t get_update_interval() const { return this->update_interval_; }
+  void set_update_interval(uint32_t update_interval) {
+    this->update_interval_ = update_interval;
+  }
+  void start_poller() { this->polling_ = this->update_interval_ != SCHEDULER_DONT_RUN; }
+  void stop_poller() { this->polling_ = false; }
+
+  // Harness statistics
+  uint32_t publish_count() const { return this->publish_count_; }
+
+protected:
+  void add_raw_touch_position_(uint8_t id, int16_t x_raw, int16_t y_raw,
+                               int16_t z_raw = 0) {
+    this->publish_count_++;
+    this->published_.push_back({id, x_raw, y_raw, z_raw});
+    for (auto &tp : this->touches) {
+      if (tp.id == id) {
+        tp.x = x_raw;
+        tp.y = y_raw;
+        tp.pressure = z_raw;
+        return;
+      }
+    }
+    TouchPoint tp;
+    tp.id = id;
+    tp.x = x_raw;
+    tp.y = y_raw;
+    tp.pressure = z_raw;
+    this->touches.push_back(tp);
+  }
+
+  std::vector<TouchListener *> listeners_;
+  uint32_t publish_count_{0};
+  // Every point handed to consumers, in order; the harness drains it
+  TouchPoints_t published_;
+  uint32_t update_interval_{50};
+  bool polling_{true};
+};
+
+} // namespace touchscreen
+} // namespace esphome
@@ -0,0 +1,16 @@
+#pragma once
+#include <cmath>
+
+#include "esphome.h"
+
+namespace esphome {
+namespace sensor {
+
+class Sensor {
+public:
+  void publish_state(float state) { this->state = state; }
+  float state{NAN};
+};
+
+} // namespace sensor
+} // namespace esphome
@@ -3,167 +3,1213 @@
 namespace esphome {
 namespace sentio {
 
-static const int SWIPE_THRESHOLD = 30; // Pixels to trigger a swipe
-static const int MAX_TAP_TIME = 400; // Max ms for a tap (otherwise it's a hold)
+static const int CALIBRATION_SHIFT = 16; // Q16.16 calibration coefficients
+static const int GRID_SHIFT = 4;         // Grid offsets are in 1/16 px
+static const uint32_t TAU_US_MHZ = 159154943; // 1e9 / (2 pi): tau (us) x fc (mHz)
+static const int PINCH_THRESHOLD = 10;   // Pixels of spread per pinch event
+static const int64_t ROTATE_THRESHOLD_SIN2 = 498; // sin^2(5 deg) in Q16
+static const uint8_t TRACE_RECORDS_PER_LINE = 8; // 128 bytes -> 172 base64 chars
+static const uint32_t CONTROLLER_RESET_MS = 10;  // RST held low on wake
+static const uint32_t CONTROLLER_STRAP_MS = 50;  // INT held after RST rises
+static const uint32_t CONTROLLER_BOOT_MS = 100;  // Until the chip answers on I2C
+static const uint32_t LIGHT_SLEEP_GUARD_MS = 100; // Awake after an INT wakeup
 
-void SmartTouchComponent::setup() { this->last_activity_time_ = millis(); }
+#ifdef USE_SENTIO_METRICS
+// Time a pipeline stage into its histogram. SCOPE covers everything until
+// the end of the enclosing block, for spans with several exits.
+#define SENTIO_METRIC_START(var) uint32_t var = micros()
+#define SENTIO_METRIC_STOP(stage, var) this->metrics_[stage].add(micros() - (var))
+#define SENTIO_METRIC_SCOPE(stage) MetricScope metric_scope_{this->metrics_[stage], micros()}
+
+struct MetricScope {
+  StageHistogram &stage;
+  uint32_t start;
+  ~MetricScope() { stage.add(micros() - start); }
+};
+
+static uint8_t metric_bucket(uint32_t us) {
+  if (us < 16)
+    return us;
+  uint32_t msb = 31 - __builtin_clz(us);
+  uint32_t bucket = 16 + (msb - 4) * 4 + ((us >> (msb - 2)) & 3);
+  return std::min(bucket, uint32_t(METRIC_BUCKETS - 1));
+}
+
+// Largest duration that lands in a bucket
+static uint32_t metric_bucket_max(uint8_t bucket) {
+  if (bucket < 16)
+    return bucket;
+  uint32_t msb = (bucket - 16) / 4 + 4;
+  uint32_t sub = (bucket - 16) % 4;
+  return ((5 + sub) << (msb - 2)) - 1;
+}
+
+void StageHistogram::add(uint32_t us) {
+  this->count++;
+  this->sum += us;
+  this->min = std::min(this->min, us);
+  this->max = std::max(this->max, us);
+  uint16_t &bucket = this->buckets[metric_bucket(us)];
+  if (bucket != UINT16_MAX)
+    bucket++;
+}
+
+uint32_t StageHistogram::percentile(uint8_t pct) const {
+  uint32_t rank = (uint64_t(this->count) * pct + 99) / 100;
+  uint32_t seen = 0;
+  for (uint8_t b = 0; b < METRIC_BUCKETS; b++) {
+    seen += this->buckets[b];
+    if (seen >= rank)
+      return std::min(metric_bucket_max(b), this->max);
+  }
+  return this->max;
+}
+#else
+#define SENTIO_METRIC_START(var)
+#define SENTIO_METRIC_STOP(stage, var)
+#define SENTIO_METRIC_SCOPE(stage)
+#endif
+
+#ifdef USE_SENTIO_MULTI_TOUCH
+// Integer square root, only evaluated when a pinch event fires
+static int32_t isqrt(uint32_t v) {
+  uint32_t root = 0;
+  uint32_t bit = 1UL << 30;
+  while (bit > v)
+    bit >>= 2;
+  while (bit != 0) {
+    if (v >= root + bit) {
+      v -= root + bit;
+      root = (root >> 1) + bit;
+    } else {
+      root >>= 1;
+    }
+    bit >>= 2;
+  }
+  return int32_t(root);
+}
+
+// atan2 in 0.1 degree units, accurate to ~0.3 degree:
+// atan(z) ~= 45 z + 15.64 z (1 - z) degrees for 0 <= z <= 1
+static int32_t atan2_decidegrees(int64_t y, int64_t x) {
+  int64_t ax = x < 0 ? -x : x;
+  int64_t ay = y < 0 ? -y : y;
+  if (ax == 0 && ay == 0)
+    return 0;
+  bool steep = ay > ax;
+  int64_t z = steep ? (ax << 15) / ay : (ay << 15) / ax; // Q15
+  int32_t angle = int32_t((450 * z + ((156 * z * ((1 << 15) - z)) >> 15)) >> 15);
+  if (steep)
+    angle = 900 - angle;
+  if (x < 0)
+    angle = 1800 - angle;
+  return y < 0 ? -angle : angle;
+}
+#endif
+
+// Median by insertion into a scratch copy, n <= MEDIAN_MAX_WINDOW
+static int16_t median(const int16_t *samples, uint8_t n) {
+  int16_t sorted[MEDIAN_MAX_WINDOW];
+  for (uint8_t i = 0; i < n; i++) {
+    int16_t v = samples[i];
+    uint8_t j = i;
+    while (j > 0 && sorted[j - 1] > v) {
+      sorted[j] = sorted[j - 1];
+      j--;
+    }
+    sorted[j] = v;
+  }
+  return sorted[n / 2];
+}
+
+// Exponential smoothing factor for a cutoff frequency, Q16:
+// alpha = 1 / (1 + tau / dt) with tau = 1 / (2 pi fc)
+static int32_t smoothing_alpha(uint32_t dt_us, uint32_t cutoff_mhz) {
+  uint32_t tau_us = TAU_US_MHZ / std::max(cutoff_mhz, uint32_t(1));
+  return int32_t((uint64_t(dt_us) << 16) / (uint64_t(dt_us) + tau_us));
+}
+
+void SmartTouchComponent::setup() {
+  // Precompute the pixel -> grid cell scale so lookups need no division
+  if (this->grid_ != nullptr) {
+    this->grid_scale_x_ =
+        ((this->grid_columns_ - 1) << 16) / std::max(this->display_width_ - 1, 1);
+    this->grid_scale_y_ =
+        ((this->grid_rows_ - 1) << 16) / std::max(this->display_height_ - 1, 1);
+  }
+
+  // The source tells us when it has new data (poll mode only relies on it
+  // while asleep). The idle timeline runs on the scheduler, so loop() never
+  // compares timestamps for it.
+  if (this->source_driver_ != nullptr) {
+    this->source_driver_->register_listener(&this->listener_);
+    this->restart_idle();
+  }
+
+#ifdef USE_SENTIO_DEBUG_RAW
+  if (this->debug_summary_)
+    this->set_interval("debug_raw", 1000, [this]() { this->log_raw_summary(); });
+#endif
+
+#ifdef USE_SENTIO_METRICS
+  this->set_interval("metrics", this->metrics_interval_ms_,
+                     [this]() { this->publish_metrics(); });
+#endif
+}
 
 void SmartTouchComponent::loop() {
   if (this->source_driver_ == nullptr)
     return;
 
-  // 1. SLEEP CHECK
-  if (millis() - this->last_activity_time_ > this->sleep_timeout_ms_) {
-    if (!this->is_sleeping_) {
-      this->is_sleeping_ = true;
-      ESP_LOGI("Sentio", "Entering Sleep Mode");
-      if (this->on_sleep_)
-        this->on_sleep_->trigger();
+#ifdef USE_SENTIO_LIGHT_SLEEP
+  // Asleep with nothing to read: park the CPU until the touch INT (or the
+  // max_duration timer) fires
+  if (this->is_sleeping_ && !this->data_pending_ && !this->wake_pending_)
+    this->light_sleep();
+#endif
+
+  if (this->update_mode_ == UPDATE_MODE_INTERRUPT) {
+    // Nothing new from the source since the last pass
+    if (!this->data_pending_)
+      return;
+    this->data_pending_ = false;
+  } else {
+    // 1. SLEEP CHECK
+    // Asleep: don't touch the source until it reports something
+    if (this->is_sleeping_ && !this->data_pending_)
+      return;
+    // Repeat pass: this frame was already filtered, recorded and fed to the
+    // gestures, running it again would count it twice. Only a touch held
+    // back by the debounce can fall due.
+    if (!this->data_pending_) {
+      this->publish_held();
+      return;
     }
+    this->data_pending_ = false;
   }
 
   // 2. READ SOURCE
   auto &src_touches = this->source_driver_->touches;
 
-  // 3. RELEASE LOGIC (Finger up)
-  if (src_touches.empty()) {
-    if (this->state_ != STATE_IDLE) {
-      this->handle_release(); // Logic for Tap detection
-      this->state_ = STATE_IDLE;
+  // Light contacts (below the pressure gate) count as no touch at all
+  bool touching = !src_touches.empty();
+  if (touching && this->min_pressure_ != 0) {
+    touching = std::any_of(
+        src_touches.begin(), src_touches.end(),
+        [this](const touchscreen::TouchPoint &p) { return this->pressure_ok(p); });
+  }
+
+#ifdef USE_SENTIO_METRICS
+  // The listener is registered in both modes, so latency is always
+  // measured from the source's report
+  this->frame_report_us_ = this->listener_.report_time;
+#endif
+
+  // 3. RELEASE LOGIC (All fingers up)
+  if (!touching) {
+    // The idle timeline starts over from the release
+    if (this->idle_paused_) {
+      this->idle_paused_ = false;
+      this->restart_idle();
+    }
+
+#ifdef USE_SENTIO_WAKE_SUPPRESSION
+    if (this->active_slots_ > 0 || this->ignore_next_release_) {
+#else
+    if (this->active_slots_ > 0) {
+#endif
+      SENTIO_METRIC_SCOPE(METRIC_STAGE_FRAME);
+      this->frame_time_ = millis();
+      for (auto &slot : this->slots_) {
+        if (slot.active)
+          this->release_slot(slot); // Logic for Tap detection
+      }
 
       // Clear output to consumers
       this->touches.clear();
 
+#ifdef USE_SENTIO_TRACE
+      TraceRecord &record = this->record_trace();
+      record = TraceRecord{};
+      record.timestamp = this->frame_time_;
+#endif
+
+#ifdef USE_SENTIO_WAKE_SUPPRESSION
       // Reset the wake-up trap
       this->ignore_next_release_ = false;
+#endif
     }
     return;
   }
 
   // 4. TOUCH DETECTED (Finger down)
-  auto raw_p = src_touches[0]; // Logic for single point
+  SENTIO_METRIC_SCOPE(METRIC_STAGE_FRAME);
+  // One clock read per frame, every stage below uses this timestamp
+  this->frame_time_ = millis();
 
   // --- DEBUGGING ---
-  if (this->debug_raw_) {
-    ESP_LOGD("Sentio", "Raw: x=%d y=%d", raw_p.x, raw_p.y);
+#ifdef USE_SENTIO_TRACE
+  // Raw frame into the recorder, points that make it through the pipeline
+  // get their calibrated position filled in below
+  this->trace_frame_ = this->trace_head_;
+  for (auto &raw_p : src_touches) {
+    TraceRecord &record = this->record_trace();
+    record.timestamp = this->frame_time_;
+    record.raw_x = raw_p.x;
+    record.raw_y = raw_p.y;
+    record.pressure = raw_p.pressure;
+    record.id = raw_p.id;
+    record.flags = TRACE_FLAG_TOUCH;
+    record.x = 0;
+    record.y = 0;
   }
+#endif
+#ifdef USE_SENTIO_DEBUG_RAW
+  this->debug_frames_++; // Lines are logged per finger once calibrated
+#endif
 
   // 5. WAKE LOGIC
-  if (this->is_sleeping_) {
-    this->is_sleeping_ = false;
-    this->last_activity_time_ = millis();
-    ESP_LOGI("Sentio", "Waking Up");
-    if (this->on_wake_)
-      this->on_wake_->trigger();
+  // A finger is down: hold the idle timeline until it lifts, so it doesn't
+  // have to be re-armed on every frame
+  if (!this->idle_paused_) {
+    this->idle_paused_ = true;
+    this->cancel_timeout("idle");
+  }
 
-    if (this->suppress_wake_click_) {
+  // Any touch restarts the idle timeline; only a sleeping (dark) screen
+  // swallows it, a dimmed one still takes the touch
+  if (this->idle_stage_ != 0) {
+#ifdef USE_SENTIO_WAKE_SUPPRESSION
+    bool was_sleeping = this->is_sleeping_;
+#endif
+    this->wake_up();
+
+#ifdef USE_SENTIO_WAKE_SUPPRESSION
+    if (was_sleeping && this->suppress_wake_click_) {
       this->ignore_next_release_ = true; // Set trap
       return;                            // Swallow this frame
     }
+#endif
   }
 
-  // Reset timer
-  this->last_activity_time_ = millis();
-
+#ifdef USE_SENTIO_WAKE_SUPPRESSION
   // If trap is set (wake-up click), ignore everything until release
   if (this->ignore_next_release_)
     return;
+#endif
+
+  // Output cadence (max_report_rate), decided once per frame for all fingers.
+  // Reports stay on a fixed grid so 100 Hz input keeps an exact 30 Hz output.
+  bool report = true;
+  if (this->report_interval_ms_ != 0) {
+    uint32_t since = this->frame_time_ - this->last_report_time_;
+    report = since >= this->report_interval_ms_;
+    if (report) {
+      this->last_report_time_ = since >= 2 * this->report_interval_ms_
+                                    ? this->frame_time_
+                                    : this->last_report_time_ + this->report_interval_ms_;
+    }
+  }
+
+  // Per-finger pipeline: only the points the source reported are visited
+  this->frame_++;
+  uint8_t seen = 0;
+  for (auto &raw_p : src_touches) {
+    // Rejected before any work; a finger that stays out is swept as lifted
+    if (this->min_pressure_ != 0 && !this->pressure_ok(raw_p))
+      continue;
+    TouchSlot *slot = this->find_slot(raw_p.id);
+    if (slot == nullptr)
+      continue; // More fingers than max_touches
+    slot->frame = this->frame_;
+    seen++;
+
+    // 6. CALIBRATE (single-frame spikes are voted out on the raw values)
+    SENTIO_METRIC_START(calibration_start);
+    auto p = raw_p;
+    if (this->median_window_ != 0)
+      this->apply_median(*slot, p);
+    p = this->apply_calibration(p);
+    SENTIO_METRIC_STOP(METRIC_STAGE_CALIBRATION, calibration_start);
+
+    // 6b. SMOOTH (jitter filter on calibrated coordinates)
+    if (this->smooth_min_cutoff_ != 0) {
+      SENTIO_METRIC_START(filter_start);
+      this->apply_smoothing(*slot, p);
+      SENTIO_METRIC_STOP(METRIC_STAGE_FILTER, filter_start);
+    }
+
+    slot->x = p.x;
+    slot->y = p.y;
+    slot->pressure = p.pressure;
+    this->record_sample(p);
+#ifdef USE_SENTIO_DEBUG_RAW
+    this->log_raw(*slot, raw_p, p);
+#endif
+#ifdef USE_SENTIO_TRACE
+    TraceRecord &record =
+        this->trace_[(this->trace_frame_ + (&raw_p - src_touches.data())) %
+                     SENTIO_TRACE_SIZE];
+    record.flags |= TRACE_FLAG_CALIBRATED;
+    record.x = p.x;
+    record.y = p.y;
+#endif
+
+    // 7. GESTURE & DEBOUNCE ENGINE
+    SENTIO_METRIC_START(gestures_start);
+    this->process_gestures(*slot, p);
+    SENTIO_METRIC_STOP(METRIC_STAGE_GESTURES, gestures_start);
+
+    // 8. OUTPUT TO CONSUMERS (LVGL)
+    // In hold mode a touch only reaches consumers once it has persisted for
+    // `debounce_ms`, so ghost pulses are never seen by LVGL.
+    if (!slot->published) {
+      if (!this->start_publishing(*slot))
+        continue;
+    } else {
+      // Press edges above and releases (release_slot) always go out at once,
+      // only moves in between are coalesced
+      if (this->report_interval_ms_ != 0) {
+        if (this->report_mode_ == REPORT_MODE_AVERAGE) {
+          slot->acc_x += p.x;
+          slot->acc_y += p.y;
+          slot->acc_n++;
+        }
+        if (!report) {
+          this->coalesced_frames_++;
+          continue;
+        }
+        if (slot->acc_n != 0) {
+          p.x = (slot->acc_x + slot->acc_n / 2) / slot->acc_n;
+          p.y = (slot->acc_y + slot->acc_n / 2) / slot->acc_n;
+          slot->acc_x = 0;
+          slot->acc_y = 0;
+          slot->acc_n = 0;
+        }
+      }
+      if (std::max(abs(p.x - slot->pub_x), abs(p.y - slot->pub_y)) <=
+          this->deadband_) {
+        // Consumers already have this point, don't make them redraw
+        this->suppressed_frames_++;
+        continue;
+      }
+    }
+    this->publish_point(*slot, p);
+  }
+
+  // Some fingers lifted while others stay down
+  if (seen < this->active_slots_) {
+    for (auto &slot : this->slots_) {
+      if (slot.active && slot.frame != this->frame_)
+        this->release_slot(slot);
+    }
+  }
+
+#ifdef USE_SENTIO_MULTI_TOUCH
+  // Two-finger gestures (pinch / rotate)
+  if (this->active_slots_ >= 2) {
+    SENTIO_METRIC_START(multi_start);
+    this->process_multi_touch();
+    SENTIO_METRIC_STOP(METRIC_STAGE_GESTURES, multi_start);
+  }
+#endif
+}
+
+bool SmartTouchComponent::pressure_ok(const touchscreen::TouchPoint &p) {
+  if (p.pressure >= this->min_pressure_)
+    return true;
+  if (p.pressure < this->release_pressure_)
+    return false;
+  // Between the thresholds only a finger that is already down stays down
+  for (auto &slot : this->slots_) {
+    if (slot.active && slot.id == p.id)
+      return true;
+  }
+  return false;
+}
+
+void SmartTouchComponent::apply_median(TouchSlot &slot,
+                                       touchscreen::TouchPoint &p) {
+  slot.raw_x[slot.raw_head] = p.x;
+  slot.raw_y[slot.raw_head] = p.y;
+  slot.raw_head = (slot.raw_head + 1) % this->median_window_;
+  if (slot.raw_count < this->median_window_)
+    slot.raw_count++;
+
+  // The first two samples of a touch pass through, after that a spike needs
+  // to persist for half the window before it moves the output
+  if (slot.raw_count < 3)
+    return;
+  p.x = median(slot.raw_x, slot.raw_count);
+  p.y = median(slot.raw_y, slot.raw_count);
+}
+
+void SmartTouchComponent::apply_smoothing(TouchSlot &slot,
+                                          touchscreen::TouchPoint &p) {
+  // One-Euro filter: heavy smoothing while still, light while moving fast
+  uint32_t now = this->frame_time_;
+  int32_t x = int32_t(p.x) << 8;
+  int32_t y = int32_t(p.y) << 8;
+  if (!slot.smoothed) {
+    slot.smoothed = true;
+    slot.smooth_time = now;
+    slot.sx = x;
+    slot.sy = y;
+    slot.svx = 0;
+    slot.svy = 0;
+    return;
+  }
+  uint32_t dt_ms = std::max(now - slot.smooth_time, uint32_t(1));
+  slot.smooth_time = now;
+
+  // Velocity (px/s) against the last filtered position, then low-passed
+  int32_t vx = ((x - slot.sx) * 1000 / int32_t(dt_ms)) >> 8;
+  int32_t vy = ((y - slot.sy) * 1000 / int32_t(dt_ms)) >> 8;
+  int32_t alpha_v = smoothing_alpha(dt_ms * 1000, this->smooth_derivative_cutoff_);
+  slot.svx += int32_t((int64_t(vx - slot.svx) * alpha_v) >> 16);
+  slot.svy += int32_t((int64_t(vy - slot.svy) * alpha_v) >> 16);
+
+  // Cutoff rises with speed, one factor shared by both axes
+  uint32_t speed = std::max(abs(slot.svx), abs(slot.svy));
+  uint32_t cutoff = this->smooth_min_cutoff_ +
+                    uint32_t(uint64_t(this->smooth_beta_) * speed / 1000);
+  int32_t alpha = smoothing_alpha(dt_ms * 1000, cutoff);
+  slot.sx += int32_t((int64_t(x - slot.sx) * alpha) >> 16);
+  slot.sy += int32_t((int64_t(y - slot.sy) * alpha) >> 16);
+
+  p.x = (slot.sx + 128) >> 8;
+  p.y = (slot.sy + 128) >> 8;
+}
+
+void SmartTouchComponent::record_sample(const touchscreen::TouchPoint &p) {
+  TouchSample &sample = this->history_[this->history_head_];
+  sample.timestamp = this->frame_time_;
+  sample.id = p.id;
+  sample.x = p.x;
+  sample.y = p.y;
+  sample.pressure = p.pressure;
+  this->history_head_ = (this->history_head_ + 1) % SENTIO_HISTORY_SIZE;
+  if (this->history_count_ < SENTIO_HISTORY_SIZE)
+    this->history_count_++;
+}
+
+#ifdef USE_SENTIO_DEBUG_RAW
+void SmartTouchComponent::log_raw(TouchSlot &slot, const touchscreen::TouchPoint &raw,
+                                  const touchscreen::TouchPoint &p) {
+  this->debug_min_x_ = std::min(this->debug_min_x_, int16_t(raw.x));
+  this->debug_max_x_ = std::max(this->debug_max_x_, int16_t(raw.x));
+  this->debug_min_y_ = std::min(this->debug_min_y_, int16_t(raw.y));
+  this->debug_max_y_ = std::max(this->debug_max_y_, int16_t(raw.y));
+
+  // Formatting is the expensive part, so filter before it
+  if (this->frame_ % this->debug_every_ != 0)
+    return;
+  // "Changed" means what it means for publishing: moved past the deadband.
+  // A new touch (gestures haven't seen it yet) always logs its first point.
+  if (this->debug_on_change_ && slot.state != STATE_IDLE &&
+      std::max(abs(p.x - slot.logged_x), abs(p.y - slot.logged_y)) <= this->deadband_)
+    return;
+  slot.logged_x = p.x;
+  slot.logged_y = p.y;
+  this->debug_lines_++;
+  ESP_LOGD("Sentio", "RAW id=%d x=%d y=%d z=%d -> CALIB x=%d y=%d", raw.id, raw.x,
+           raw.y, raw.pressure, p.x, p.y);
+}
+
+void SmartTouchComponent::log_raw_summary() {
+  if (this->debug_frames_ == 0)
+    return; // Nothing touched this second
+  ESP_LOGD("Sentio", "RAW summary: %u frames/s, %u logged, x %d..%d, y %d..%d",
+           this->debug_frames_, this->debug_lines_, this->debug_min_x_,
+           this->debug_max_x_, this->debug_min_y_, this->debug_max_y_);
+  this->debug_frames_ = 0;
+  this->debug_lines_ = 0;
+  this->debug_min_x_ = INT16_MAX;
+  this->debug_max_x_ = INT16_MIN;
+  this->debug_min_y_ = INT16_MAX;
+  this->debug_max_y_ = INT16_MIN;
+}
+#endif
 
-  // 6. CALIBRATE
-  auto p = this->apply_calibration(raw_p);
+#ifdef USE_SENTIO_TRACE
+TraceRecord &SmartTouchComponent::record_trace() {
+  TraceRecord &record = this->trace_[this->trace_head_];
+  this->trace_head_ = (this->trace_head_ + 1) % SENTIO_TRACE_SIZE;
+  if (this->trace_count_ < SENTIO_TRACE_SIZE)
+    this->trace_count_++;
+  return record;
+}
+#endif
 
-  // 7. GESTURE & DEBOUNCE ENGINE
-  this->process_gestures(p);
+void SmartTouchComponent::dump_trace() {
+#ifdef USE_SENTIO_TRACE
+  // One burst on demand: nothing is formatted while recording
+  ESP_LOGI("Sentio", "TRACE BEGIN v2 records=%u capacity=%u", this->trace_count_,
+           SENTIO_TRACE_SIZE);
+  uint16_t oldest = (this->trace_head_ + SENTIO_TRACE_SIZE - this->trace_count_) %
+                    SENTIO_TRACE_SIZE;
+  uint8_t line[TRACE_RECORDS_PER_LINE * sizeof(TraceRecord)];
+  for (uint16_t i = 0; i < this->trace_count_; i += TRACE_RECORDS_PER_LINE) {
+    uint16_t n = std::min<uint16_t>(TRACE_RECORDS_PER_LINE, this->trace_count_ - i);
+    for (uint16_t j = 0; j < n; j++) {
+      memcpy(line + j * sizeof(TraceRecord),
+             &this->trace_[(oldest + i + j) % SENTIO_TRACE_SIZE], sizeof(TraceRecord));
+    }
+    ESP_LOGI("Sentio", "TRACE %s", base64_encode(line, n * sizeof(TraceRecord)).c_str());
+  }
+  ESP_LOGI("Sentio", "TRACE END");
+#else
+  ESP_LOGW("Sentio", "Trace recorder disabled, set trace_buffer_size");
+#endif
+}
+
+bool SmartTouchComponent::get_velocity(uint8_t id, uint32_t window_ms,
+                                       int32_t &vx, int32_t &vy) const {
+  // Newest and oldest sample of this finger inside the window
+  const TouchSample *newest = nullptr, *oldest = nullptr;
+  for (uint8_t age = 0; age < this->history_count_; age++) {
+    const TouchSample &sample = this->get_history(age);
+    if (sample.id != id)
+      continue;
+    if (newest == nullptr) {
+      newest = &sample;
+    } else if (newest->timestamp - sample.timestamp > window_ms) {
+      break;
+    }
+    oldest = &sample;
+  }
+  if (newest == nullptr || oldest == newest)
+    return false;
+  int32_t dt = newest->timestamp - oldest->timestamp;
+  if (dt <= 0)
+    return false;
+  vx = (int32_t(newest->x) - oldest->x) * 1000 / dt;
+  vy = (int32_t(newest->y) - oldest->y) * 1000 / dt;
+  return true;
+}
+
+TouchSlot *SmartTouchComponent::find_slot(uint8_t id) {
+  TouchSlot *free_slot = nullptr;
+  for (auto &slot : this->slots_) {
+    if (slot.active && slot.id == id)
+      return &slot;
+    if (!slot.active && free_slot == nullptr)
+      free_slot = &slot;
+  }
+  if (free_slot != nullptr) {
+    free_slot->active = true;
+    free_slot->id = id;
+    free_slot->state = STATE_IDLE;
+    free_slot->published = false;
+    free_slot->smoothed = false;
+    free_slot->raw_head = 0;
+    free_slot->raw_count = 0;
+#ifdef USE_SENTIO_MULTI_TOUCH
+    free_slot->landed = ++this->landings_;
+#endif
+    this->active_slots_++;
+  }
+  return free_slot;
+}
+
+void SmartTouchComponent::release_slot(TouchSlot &slot) {
+  // Moves coalesced since the last report would be lost with the slot, so
+  // consumers get where the finger really was before they see it lift
+  if (slot.published && this->report_interval_ms_ != 0) {
+    touchscreen::TouchPoint p;
+    p.id = slot.id;
+    p.x = slot.x;
+    p.y = slot.y;
+    p.pressure = slot.pressure;
+    if (this->report_mode_ == REPORT_MODE_AVERAGE && slot.acc_n != 0) {
+      p.x = (slot.acc_x + slot.acc_n / 2) / slot.acc_n;
+      p.y = (slot.acc_y + slot.acc_n / 2) / slot.acc_n;
+    }
+    if (p.x != slot.pub_x || p.y != slot.pub_y)
+      this->publish_point(slot, p);
+  }
+
+#ifdef USE_SENTIO_GESTURES
+  if (&slot == this->hold_slot_)
+    this->cancel_hold();
+#endif
+  this->handle_release(slot);
+  slot.state = STATE_IDLE;
+  slot.active = false;
+  this->active_slots_--;
+#ifdef USE_SENTIO_MULTI_TOUCH
+  if (this->active_slots_ < 2)
+    this->multi_touch_ = false;
+#endif
+
+  // Drop this finger from the output to consumers
+  uint8_t id = slot.id;
+  this->touches.erase(std::remove_if(this->touches.begin(), this->touches.end(),
+                                     [id](const touchscreen::TouchPoint &tp) {
+                                       return tp.id == id;
+                                     }),
+                      this->touches.end());
+}
+
+bool SmartTouchComponent::start_publishing(TouchSlot &slot) {
+  uint32_t held = this->frame_time_ - slot.gesture_start_time;
+  if (this->debounce_mode_ == DEBOUNCE_MODE_HOLD && held < this->debounce_ms_)
+    return false;
+  slot.published = true;
+  slot.acc_x = 0;
+  slot.acc_y = 0;
+  slot.acc_n = 0;
+  this->publish_latency_ = held;
+  this->max_publish_latency_ = std::max(this->max_publish_latency_, held);
+  return true;
+}
 
-  // 8. OUTPUT TO CONSUMERS (LVGL)
-  // Only update LVGL if we passed the debounce check (handled in
-  // process_gestures) For the MVP, we just pass it through, but ideally, we
-  // wait `debounce_ms`
+void SmartTouchComponent::publish_point(TouchSlot &slot, const touchscreen::TouchPoint &p) {
+  slot.pub_x = p.x;
+  slot.pub_y = p.y;
   this->add_raw_touch_position_(p.id, p.x, p.y, p.pressure);
+#ifdef USE_SENTIO_METRICS
+  this->metrics_[METRIC_STAGE_LATENCY].add(micros() - this->frame_report_us_);
+#endif
+}
+
+void SmartTouchComponent::publish_held() {
+  if (this->debounce_mode_ != DEBOUNCE_MODE_HOLD || this->active_slots_ == 0)
+    return;
+#ifdef USE_SENTIO_WAKE_SUPPRESSION
+  if (this->ignore_next_release_)
+    return;
+#endif
+  this->frame_time_ = millis();
+  for (auto &slot : this->slots_) {
+    // STATE_IDLE: seen by find_slot() but not by the gestures yet
+    if (!slot.active || slot.published || slot.state == STATE_IDLE)
+      continue;
+    if (!this->start_publishing(slot))
+      continue;
+    touchscreen::TouchPoint p;
+    p.id = slot.id;
+    p.x = slot.x;
+    p.y = slot.y;
+    p.pressure = slot.pressure;
+    this->publish_point(slot, p);
+  }
 }
 
 touchscreen::TouchPoint
 SmartTouchComponent::apply_calibration(touchscreen::TouchPoint p) {
-  int x = p.x;
-  int y = p.y;
-
-  // 1. Swap
-  if (this->swap_xy_)
-    std::swap(x, y);
+  // Swap, invert, scale and offset are all folded into one affine matrix at
+  // compile time, so the hot path is a multiply-add per axis.
+  const int32_t *m = this->calibration_;
+  int32_t x = (int64_t(m[0]) * p.x + int64_t(m[1]) * p.y + m[2]) >>
+              CALIBRATION_SHIFT;
+  int32_t y = (int64_t(m[3]) * p.x + int64_t(m[4]) * p.y + m[5]) >>
+              CALIBRATION_SHIFT;
 
-  // 2. Invert (Requires display resolution)
-  // Note: If swapped, x is now relative to the *height* dimension
-  int width = this->swap_xy_ ? this->display_height_ : this->display_width_;
-  int height = this->swap_xy_ ? this->display_width_ : this->display_height_;
+  // Clamp to the display area
+  int32_t max_x = this->display_width_ - 1;
+  int32_t max_y = this->display_height_ - 1;
+  x = std::min(std::max(x, int32_t(0)), max_x);
+  y = std::min(std::max(y, int32_t(0)), max_y);
 
-  if (this->invert_x_)
-    x = width - x;
-  if (this->invert_y_)
-    y = height - y;
-
-  // Clamp to 0
-  if (x < 0)
-    x = 0;
-  if (y < 0)
-    y = 0;
+  // Edge distortion the affine part can't express
+  if (this->grid_ != nullptr) {
+    this->apply_grid_correction(x, y);
+    x = std::min(std::max(x, int32_t(0)), max_x);
+    y = std::min(std::max(y, int32_t(0)), max_y);
+  }
 
   p.x = x;
   p.y = y;
   return p;
 }
 
-void SmartTouchComponent::process_gestures(touchscreen::TouchPoint p) {
-  switch (this->state_) {
+void SmartTouchComponent::apply_grid_correction(int32_t &x, int32_t &y) {
+  // Cell index and Q8 position inside the cell. The last row/column is
+  // folded into the previous cell with a fraction of 1.0.
+  uint32_t gx = uint32_t(x) * this->grid_scale_x_;
+  uint32_t gy = uint32_t(y) * this->grid_scale_y_;
+  uint32_t cx = std::min(gx >> 16, uint32_t(this->grid_columns_ - 2));
+  uint32_t cy = std::min(gy >> 16, uint32_t(this->grid_rows_ - 2));
+  int32_t fx = int32_t((gx - (cx << 16)) >> 8);
+  int32_t fy = int32_t((gy - (cy << 16)) >> 8);
+
+  const int16_t *n00 = this->grid_ + 2 * (cy * this->grid_columns_ + cx);
+  const int16_t *n01 = n00 + 2 * this->grid_columns_;
+  auto read = [](const int16_t *p) -> int32_t {
+    return int16_t(progmem_read_uint16(reinterpret_cast<const uint16_t *>(p)));
+  };
+
+  // Bilinear blend of the four surrounding nodes, rounded to whole pixels
+  auto blend = [&](int axis) -> int32_t {
+    int32_t top = read(n00 + axis) * (256 - fx) + read(n00 + 2 + axis) * fx;
+    int32_t bottom = read(n01 + axis) * (256 - fx) + read(n01 + 2 + axis) * fx;
+    return (top * (256 - fy) + bottom * fy + (1 << (15 + GRID_SHIFT))) >>
+           (16 + GRID_SHIFT);
+  };
+  x += blend(0);
+  y += blend(1);
+}
+
+void SmartTouchComponent::process_gestures(TouchSlot &slot,
+                                           touchscreen::TouchPoint p) {
+  switch (slot.state) {
   case STATE_IDLE:
     // Start of a touch
-    this->state_ = STATE_START;
-    this->start_x_ = p.x;
-    this->start_y_ = p.y;
-    this->gesture_start_time_ = millis();
+    slot.state = STATE_START;
+    slot.start_x = p.x;
+    slot.start_y = p.y;
+    slot.gesture_start_time = this->frame_time_;
+
+#ifdef USE_SENTIO_GESTURES
+    // Long press / hold-repeat are single-finger gestures
+    if (this->active_slots_ == 1 &&
+        (this->on_long_press_ || this->on_hold_repeat_))
+      this->arm_hold(slot);
+#endif
     break;
 
-  case STATE_START:
+#ifdef USE_SENTIO_GESTURES
+  case STATE_START: {
     // Check for Swipe
-    int dx = p.x - this->start_x_;
-    int dy = p.y - this->start_y_;
-
-    // Horizontal Swipe Detection
-    if (abs(dx) > SWIPE_THRESHOLD) {
-      this->state_ = STATE_DRAGGING;
-      if (dx > 0) {
-        if (this->on_swipe_right_)
-          this->on_swipe_right_->trigger();
-      } else {
-        if (this->on_swipe_left_)
-          this->on_swipe_left_->trigger();
-      }
+    int dx = p.x - slot.start_x;
+    int dy = p.y - slot.start_y;
+    int adx = abs(dx);
+    int ady = abs(dy);
+    int distance = std::max(adx, ady);
+    if (distance <= this->swipe_threshold_)
+      break;
+
+    // Past the threshold this is a drag, whether or not it is a swipe. The
+    // axis is locked here, so a vertical scroll never fires a horizontal swipe.
+    slot.state = STATE_DRAGGING;
+    if (&slot == this->hold_slot_)
+      this->cancel_hold();
+
+    // Too slow for a swipe: it's a scroll (dx/dt compared without dividing)
+    uint32_t duration = this->frame_time_ - slot.gesture_start_time;
+    if (uint64_t(distance) * 1000 < uint64_t(this->swipe_min_velocity_) * duration)
+      break;
+
+    Trigger<> *trigger = nullptr;
+    if (uint32_t(adx) * 256 > uint32_t(ady) * this->swipe_axis_ratio_) {
+      trigger = dx > 0 ? this->on_swipe_right_ : this->on_swipe_left_;
+    } else if (uint32_t(ady) * 256 > uint32_t(adx) * this->swipe_axis_ratio_) {
+      trigger = dy > 0 ? this->on_swipe_down_ : this->on_swipe_up_;
     }
+    // Diagonal drags (no dominant axis) don't fire a swipe
+    if (trigger)
+      trigger->trigger();
     break;
+  }
 
   case STATE_DRAGGING:
     // We already triggered the swipe, just wait for release
     break;
+
+  case STATE_HOLD:
+    // Sliding off a held button stops the repeat
+    if (&slot == this->hold_slot_ &&
+        std::max(abs(p.x - slot.start_x), abs(p.y - slot.start_y)) >
+            this->swipe_threshold_)
+      this->cancel_hold();
+    break;
+#endif
+
+  default:
+    // Released or owned by a two-finger gesture
+    break;
   }
 }
 
-void SmartTouchComponent::handle_release() {
+void SmartTouchComponent::handle_release(TouchSlot &slot) {
   // If we are releasing, and we never left STATE_START, it's a TAP
-  if (this->state_ == STATE_START) {
-    uint32_t duration = millis() - this->gesture_start_time_;
+  if (slot.state == STATE_START) {
+    uint32_t duration = this->frame_time_ - slot.gesture_start_time;
 
-    // Ghost Touch Filter: If touch was too short (WiFi noise), ignore it
-    if (duration < this->debounce_ms_) {
+    // Ghost Touch Filter: If touch was too short (WiFi noise), ignore it.
+    // In hold mode that is any touch consumers never saw, so the tap
+    // verdict can't disagree with what LVGL got.
+    bool ghost = this->debounce_mode_ == DEBOUNCE_MODE_HOLD
+                     ? !slot.published
+                     : duration < this->debounce_ms_;
+    if (ghost) {
       ESP_LOGD("Sentio", "Ignored noise pulse (<%dms)", this->debounce_ms_);
-      // Also clear the 'touches' buffer so LVGL doesn't see it
-      this->touches.clear();
+      this->ghost_touches_++;
+      return;
+    }
+
+#ifdef USE_SENTIO_GESTURES
+    if (duration < this->tap_max_duration_)
+      this->emit_tap(slot);
+#endif
+  }
+}
+
+#ifdef USE_SENTIO_GESTURES
+void SmartTouchComponent::emit_tap(const TouchSlot &slot) {
+  if (this->on_double_tap_ == nullptr) {
+    if (this->on_tap_)
+      this->on_tap_->trigger();
+    return;
+  }
+
+  // Second tap close to the first one inside the window
+  if (this->tap_pending_) {
+    this->cancel_timeout("tap");
+    this->tap_pending_ = false;
+    if (std::max(abs(slot.start_x - this->tap_x_),
+                 abs(slot.start_y - this->tap_y_)) <= this->swipe_threshold_) {
+      this->on_double_tap_->trigger();
       return;
     }
+    // Too far away: the first one was a plain tap after all
+    if (this->on_tap_)
+      this->on_tap_->trigger();
+  }
+
+  // Hold the tap back until we know no second tap follows
+  this->tap_pending_ = true;
+  this->tap_x_ = slot.start_x;
+  this->tap_y_ = slot.start_y;
+  this->set_timeout("tap", this->double_tap_window_ms_, [this]() {
+    this->tap_pending_ = false;
+    if (this->on_tap_)
+      this->on_tap_->trigger();
+  });
+}
+
+void SmartTouchComponent::arm_hold(TouchSlot &slot) {
+  this->hold_slot_ = &slot;
+  this->set_timeout("long_press", this->long_press_ms_, [this]() {
+    TouchSlot *held = this->hold_slot_;
+    if (held == nullptr || held->state != STATE_START)
+      return;
+    held->state = STATE_HOLD; // Release is no longer a tap
+    if (this->on_long_press_)
+      this->on_long_press_->trigger();
+    if (this->on_hold_repeat_) {
+      this->set_interval("hold_repeat", this->hold_repeat_ms_, [this]() {
+        this->on_hold_repeat_->trigger();
+      });
+    }
+  });
+}
+
+void SmartTouchComponent::cancel_hold() {
+  this->cancel_timeout("long_press");
+  this->cancel_interval("hold_repeat");
+  this->hold_slot_ = nullptr;
+}
+#endif
+
+#ifdef USE_SENTIO_MULTI_TOUCH
+void SmartTouchComponent::process_multi_touch() {
+  // The two fingers that went down first drive the gesture. Every finger
+  // on the panel is part of it, so none of them can be a tap or swipe.
+  TouchSlot *a = nullptr, *b = nullptr;
+  for (auto &slot : this->slots_) {
+    if (!slot.active)
+      continue;
+    slot.state = STATE_MULTI;
+    if (a == nullptr || slot.landed < a->landed) {
+      b = a;
+      a = &slot;
+    } else if (b == nullptr || slot.landed < b->landed) {
+      b = &slot;
+    }
+  }
+
+  int32_t vx = b->x - a->x;
+  int32_t vy = b->y - a->y;
+  int32_t d2 = vx * vx + vy * vy;
+
+  // Gesture start, or one of the pair lifted while others stay down: start
+  // over from the new pair instead of comparing against the old one
+  if (!this->multi_touch_ || a->id != this->pair_a_id_ || b->id != this->pair_b_id_) {
+#ifdef USE_SENTIO_GESTURES
+    if (this->hold_slot_ != nullptr)
+      this->cancel_hold();
+#endif
+    this->multi_touch_ = true;
+    this->pair_a_id_ = a->id;
+    this->pair_b_id_ = b->id;
+    this->pinch_distance_ = isqrt(d2);
+    this->rotate_ref_x_ = vx;
+    this->rotate_ref_y_ = vy;
+    return;
+  }
+
+  // Pinch: compare squared distances, the root is only taken on an event
+  if (this->on_pinch_ != nullptr) {
+    int32_t lo = std::max(this->pinch_distance_ - PINCH_THRESHOLD, 0);
+    int32_t hi = this->pinch_distance_ + PINCH_THRESHOLD;
+    if (d2 >= hi * hi || d2 <= lo * lo) {
+      int32_t d = isqrt(d2);
+      if (this->pinch_distance_ > 0 && d > 0)
+        this->on_pinch_->trigger((d << 8) / this->pinch_distance_);
+      this->pinch_distance_ = d;
+    }
+  }
+
+  // Rotate: cross/dot against the last event's vector, so the angle is only
+  // resolved once it has moved past the threshold
+  if (this->on_rotate_ != nullptr && d2 > 0) {
+    int64_t rx = this->rotate_ref_x_;
+    int64_t ry = this->rotate_ref_y_;
+    int64_t cross = rx * vy - ry * vx;
+    int64_t dot = rx * vx + ry * vy;
+    if (dot <= 0 ||
+        (cross * cross << 16) >= ROTATE_THRESHOLD_SIN2 * (rx * rx + ry * ry) * d2) {
+      if (rx != 0 || ry != 0)
+        this->on_rotate_->trigger(atan2_decidegrees(cross, dot));
+      this->rotate_ref_x_ = vx;
+      this->rotate_ref_y_ = vy;
+    }
+  }
+}
+#endif
+
+#ifdef USE_SENTIO_METRICS
+void SmartTouchComponent::publish_metrics() {
+  for (uint8_t stage = 0; stage < METRIC_STAGE_COUNT; stage++) {
+    StageHistogram &h = this->metrics_[stage];
+    if (h.count == 0)
+      continue; // Stage didn't run, sensors keep their last value
+    uint32_t values[METRIC_STAT_COUNT] = {h.min, uint32_t(h.sum / h.count), h.max,
+                                          h.percentile(99)};
+    for (uint8_t stat = 0; stat < METRIC_STAT_COUNT; stat++) {
+      if (this->metric_sensors_[stage][stat] != nullptr)
+        this->metric_sensors_[stage][stat]->publish_state(values[stat]);
+    }
+    h.reset();
+  }
+}
+#endif
+
+void SmartTouchComponent::enter_idle_stage(const IdleStage &stage) {
+  if (stage.state != IDLE_STATE_AWAKE && !this->is_sleeping_)
+    this->enter_sleep();
+#ifdef USE_SENTIO_CONTROLLER_SLEEP
+  if (stage.state == IDLE_STATE_CONTROLLER_OFF)
+    this->controller_off();
+#endif
+  if (stage.trigger)
+    stage.trigger->trigger();
+}
+
+void SmartTouchComponent::enter_sleep() {
+  this->is_sleeping_ = true;
+  ESP_LOGI("Sentio", "Entering Sleep Mode");
+
+  // Hard sleep: slow the source's I2C polling down, or stop it and leave
+  // waking to the controller's INT pin
+  if (this->sleep_update_interval_ != 0) {
+    this->throttle_source(this->sleep_update_interval_);
+  }
+
+  if (this->on_sleep_)
+    this->on_sleep_->trigger();
+}
+
+void SmartTouchComponent::wake_up() {
+  if (this->is_sleeping_)
+    ESP_LOGI("Sentio", "Waking Up");
+  this->is_sleeping_ = false;
+  this->idle_stage_ = 0;
+
+#ifdef USE_SENTIO_LIGHT_SLEEP
+  this->wake_pending_ = false;
+  this->cancel_timeout("light_sleep_guard");
+#endif
+
+#ifdef USE_SENTIO_CONTROLLER_SLEEP
+  if (this->controller_asleep_) {
+    this->controller_asleep_ = false;
+    this->reset_controller(); // Restores the source once the chip is back
+  } else
+#endif
+  this->restore_source();
+
+  if (this->on_wake_)
+    this->on_wake_->trigger();
+}
+
+void SmartTouchComponent::wake() {
+  if (this->idle_stage_ != 0)
+    this->wake_up();
+  // A finger that is down restarts the timeline on release instead
+  if (!this->idle_paused_)
+    this->restart_idle();
+}
+
+void SmartTouchComponent::throttle_source(uint32_t interval) {
+  // Keep the first saved interval if sleep is entered again mid-restore
+  if (this->awake_update_interval_ == 0)
+    this->awake_update_interval_ = this->source_driver_->get_update_interval();
+  this->source_driver_->set_update_interval(interval);
+  if (interval == SCHEDULER_DONT_RUN) {
+    this->source_driver_->stop_poller();
+  } else {
+    this->source_driver_->start_poller(); // Re-arm with the new interval
+  }
+}
+
+void SmartTouchComponent::restore_source() {
+  if (this->awake_update_interval_ == 0)
+    return;
+  this->source_driver_->set_update_interval(this->awake_update_interval_);
+  this->source_driver_->start_poller();
+  this->awake_update_interval_ = 0;
+}
+
+#ifdef USE_SENTIO_CONTROLLER_SLEEP
+void SmartTouchComponent::controller_off() {
+  // The chip stops scanning, so there is nothing to poll until wake_up()
+  // resets it. A failed command leaves it in soft sleep.
+  if (this->controller_asleep_)
+    return;
+  // A reset still in flight is cut short, its pins are let go first
+  this->cancel_timeout("controller_reset");
+  this->controller_reset_pin_->digital_write(true);
+  if (this->controller_strapped_)
+    this->release_interrupt_pin();
+  if (this->send_sleep_command()) {
+    this->controller_asleep_ = true;
+    this->throttle_source(SCHEDULER_DONT_RUN);
+  }
+}
+
+bool SmartTouchComponent::send_sleep_command() {
+  i2c::ErrorCode err;
+  switch (this->controller_) {
+    case SLEEP_CONTROLLER_GT911: {
+      const uint8_t command = 0x05;
+      err = this->controller_device_->write_register16(0x8040, &command, 1);
+      break;
+    }
+    case SLEEP_CONTROLLER_CST816: {
+      const uint8_t command = 0x03;
+      err = this->controller_device_->write_register(0xA5, &command, 1);
+      break;
+    }
+    default:
+      return false;
+  }
+  if (err != i2c::ERROR_OK) {
+    ESP_LOGW("Sentio", "Controller sleep command failed (%d), soft sleep", err);
+    return false;
+  }
+  return true;
+}
+
+void SmartTouchComponent::reset_controller() {
+  // A sleeping GT911/CST816 only answers again after a reset. The GT911
+  // latches its I2C address from INT on the rising RST edge, so INT is held
+  // low through it (0x5D, as the esphome gt911 driver straps it). The source
+  // stays stopped until the chip has booted, so it doesn't read garbage.
+  bool strap = this->controller_ == SLEEP_CONTROLLER_GT911 &&
+               this->controller_interrupt_pin_ != nullptr;
+  if (strap) {
+#ifdef USE_ESP32
+    // pin_mode() drops the interrupt, keep the edge the driver attached
+    this->controller_interrupt_type_ = gpio_int_type_t(
+        GPIO.pin[this->controller_interrupt_pin_->get_pin()].int_type);
+#endif
+    this->controller_interrupt_pin_->pin_mode(gpio::FLAG_OUTPUT);
+    this->controller_interrupt_pin_->digital_write(false);
+    this->controller_strapped_ = true;
+  }
+  this->controller_reset_pin_->digital_write(false);
+  this->set_timeout("controller_reset", CONTROLLER_RESET_MS, [this]() {
+    this->controller_reset_pin_->digital_write(true);
+    this->set_timeout("controller_reset", CONTROLLER_STRAP_MS, [this]() {
+      if (this->controller_strapped_)
+        this->release_interrupt_pin();
+      this->set_timeout("controller_reset", CONTROLLER_BOOT_MS,
+                        [this]() { this->restore_source(); });
+    });
+  });
+}
 
-    if (duration < MAX_TAP_TIME) {
-      if (this->on_tap_)
-        this->on_tap_->trigger();
+void SmartTouchComponent::release_interrupt_pin() {
+  // Back to the source driver's input, with its interrupt
+  InternalGPIOPin *pin = this->controller_interrupt_pin_;
+  this->controller_strapped_ = false;
+  pin->pin_mode(pin->get_flags());
+#ifdef USE_ESP32
+  if (this->controller_interrupt_type_ != GPIO_INTR_DISABLE) {
+    gpio_set_intr_type(gpio_num_t(pin->get_pin()), this->controller_interrupt_type_);
+    gpio_intr_enable(gpio_num_t(pin->get_pin()));
+  }
+#endif
+}
+#endif
+
+#ifdef USE_SENTIO_LIGHT_SLEEP
+void SmartTouchComponent::light_sleep() {
+  gpio_num_t pin = gpio_num_t(this->light_sleep_pin_);
+  // INT polarity from the edge the source driver attached (the GT911 picks
+  // rising or falling from its config, inverted pins flip it), read back
+  // from the pin so it can be restored as it was
+  auto edge = gpio_int_type_t(GPIO.pin[pin].int_type);
+  int active;
+  if (edge == GPIO_INTR_NEGEDGE || edge == GPIO_INTR_LOW_LEVEL) {
+    active = 0;
+  } else if (edge == GPIO_INTR_POSEDGE || edge == GPIO_INTR_HIGH_LEVEL) {
+    active = 1;
+  } else {
+    // Not attached (yet) or any edge: no level to wake on
+    if (!this->light_sleep_warned_) {
+      this->light_sleep_warned_ = true;
+      ESP_LOGW("Sentio", "INT pin %d has no single-edge interrupt, light sleep skipped", pin);
     }
+    return;
   }
+  // INT already active: a report is on its way, don't sleep through it
+  if (gpio_get_level(pin) == active)
+    return;
+
+  // GPIO wakeup reuses the pin's interrupt type, so the source's ISR is kept
+  // off while the pin is level triggered and gets its own edge back after
+  gpio_intr_disable(pin);
+  gpio_wakeup_enable(pin, active ? GPIO_INTR_HIGH_LEVEL : GPIO_INTR_LOW_LEVEL);
+  esp_sleep_enable_gpio_wakeup();
+  esp_sleep_enable_timer_wakeup(uint64_t(this->light_sleep_max_ms_) * 1000);
+  esp_light_sleep_start();
+  gpio_wakeup_disable(pin);
+  gpio_set_intr_type(pin, edge);
+  gpio_intr_enable(pin);
+
+  if (esp_sleep_get_wakeup_cause() != ESP_SLEEP_WAKEUP_GPIO)
+    return; // max_duration elapsed
+
+  // The edge that woke us came with the ISR off, so the source missed that
+  // report. Stay awake for the next one (the chip keeps reporting while the
+  // finger is down): it wakes Sentio and is swallowed as the wake click.
+  this->wake_pending_ = true;
+  this->set_timeout("light_sleep_guard", LIGHT_SLEEP_GUARD_MS,
+                    [this]() { this->wake_pending_ = false; });
+}
+#endif
+
+void SmartTouchComponent::restart_idle() {
+  if (!this->idle_stages_.empty())
+    this->schedule_idle(this->idle_stages_[0].timeout);
+}
+
+void SmartTouchComponent::schedule_idle(uint32_t delay) {
+  // Cancelled while a finger is down and re-armed on release, so the
+  // callback never has to look at the clock
+  this->set_timeout("idle", delay, [this]() {
+    const IdleStage &stage = this->idle_stages_[this->idle_stage_];
+    uint8_t next = ++this->idle_stage_;
+    this->enter_idle_stage(stage);
+    // Done, or the stage's automation already woke us (sentio.wake)
+    if (this->idle_stage_ != next || next >= this->idle_stages_.size())
+      return;
+    this->schedule_idle(this->idle_stages_[next].timeout - stage.timeout);
+  });
 }
 
 // Boilerplate to register triggers
@@ -172,8 +1218,18 @@ Trigger<> *SmartTouchComponent::get_trigger(const std::string &conf) {
     return this->on_swipe_left_;
   if (conf == "on_swipe_right")
     return this->on_swipe_right_;
+  if (conf == "on_swipe_up")
+    return this->on_swipe_up_;
+  if (conf == "on_swipe_down")
+    return this->on_swipe_down_;
   if (conf == "on_tap")
     return this->on_tap_;
+  if (conf == "on_double_tap")
+    return this->on_double_tap_;
+  if (conf == "on_long_press")
+    return this->on_long_press_;
+  if (conf == "on_hold_repeat")
+    return this->on_hold_repeat_;
   if (conf == "on_wake")
     return this->on_wake_;
   if (conf == "on_sleep")
@@ -2,6 +2,34 @@
 #include "esphome.h"
 #include "esphome/components/touchscreen/touchscreen.h"
 #include "esphome/core/automation.h"
+#ifdef USE_SENTIO_METRICS
+#include "esphome/components/sensor/sensor.h"
+#endif
+#ifdef USE_SENTIO_CONTROLLER_SLEEP
+#include "esphome/components/i2c/i2c.h"
+#endif
+#if defined(USE_SENTIO_LIGHT_SLEEP) || (defined(USE_SENTIO_CONTROLLER_SLEEP) && defined(USE_ESP32))
+#include <driver/gpio.h>
+#include <soc/gpio_struct.h>
+#endif
+#ifdef USE_SENTIO_LIGHT_SLEEP
+#include <esp_sleep.h>
+#endif
+
+// Touch ids tracked at once, set from `max_touches` by the codegen
+#ifndef SENTIO_MAX_TOUCHES
+#define SENTIO_MAX_TOUCHES 1
+#endif
+
+// Calibrated samples kept for lambdas, set from `history_size` by the codegen
+#ifndef SENTIO_HISTORY_SIZE
+#define SENTIO_HISTORY_SIZE 16
+#endif
+
+// Trace recorder records, set from `trace_buffer_size` by the codegen
+#ifndef SENTIO_TRACE_SIZE
+#define SENTIO_TRACE_SIZE 256
+#endif
 
 namespace esphome {
 namespace sentio {
@@ -11,7 +39,169 @@ enum TouchState {
   STATE_IDLE,     // Waiting
   STATE_START,    // Touched, calculating intent
   STATE_DRAGGING, // Moving > threshold (Swipe)
-  STATE_RELEASED  // Let go
+  STATE_MULTI,    // Part of a two-finger gesture (pinch / rotate)
+  STATE_HOLD      // Held past long_press_time without moving
+};
+
+// One calibrated sample in the history ring, packed to 11 bytes
+struct __attribute__((packed)) TouchSample {
+  uint32_t timestamp; // millis() when the frame was processed
+  uint8_t id;
+  int16_t x, y;
+  uint16_t pressure;
+};
+
+#ifdef USE_SENTIO_TRACE
+// One point in the trace recorder, 16 bytes. The layout is the "SNTR" v2
+// record of bench/sentio_replay.cpp, so a dump replays on the host as is.
+struct __attribute__((packed)) TraceRecord {
+  uint32_t timestamp; // millis(), records of one frame share it
+  int16_t raw_x, raw_y;
+  int16_t pressure;
+  uint8_t id;
+  uint8_t flags;  // TRACE_FLAG_*
+  int16_t x, y;   // Calibrated, valid with TRACE_FLAG_CALIBRATED
+};
+static const uint8_t TRACE_FLAG_TOUCH = 0x01;      // Finger down (else a release)
+static const uint8_t TRACE_FLAG_CALIBRATED = 0x02; // Point went through the pipeline
+#endif
+
+// Largest median_filter window (raw samples kept per finger)
+static const uint8_t MEDIAN_MAX_WINDOW = 5;
+
+// Per-finger pipeline state, one slot per tracked touch id
+struct TouchSlot {
+  bool active{false};
+  uint8_t id{0};
+  uint32_t frame{0}; // Last frame the source reported this id
+  int16_t x{0}, y{0}; // Last calibrated position
+  int16_t pressure{0}; // Pressure the source reported with it
+  bool published{false}; // Reached consumers (passed the debounce hold)
+#ifdef USE_SENTIO_DEBUG_RAW
+  int16_t logged_x{0}, logged_y{0}; // Calibrated position of the last debug line
+#endif
+  int16_t pub_x{0}, pub_y{0}; // Last position handed to consumers
+#ifdef USE_SENTIO_MULTI_TOUCH
+  uint32_t landed{0}; // Landing order, lower went down first
+#endif
+  int32_t acc_x{0}, acc_y{0}; // Samples coalesced since the last report
+  uint16_t acc_n{0};
+
+  // Spike Filter State (ring of the last raw samples)
+  int16_t raw_x[MEDIAN_MAX_WINDOW], raw_y[MEDIAN_MAX_WINDOW];
+  uint8_t raw_head{0}, raw_count{0};
+
+  // Jitter Filter State (One-Euro, Q8 pixels)
+  bool smoothed{false};
+  uint32_t smooth_time{0};
+  int32_t sx{0}, sy{0};   // Filtered position
+  int32_t svx{0}, svy{0}; // Filtered velocity (px/s)
+
+  // Gesture State
+  TouchState state{STATE_IDLE};
+  uint32_t gesture_start_time{0};
+  int16_t start_x{0}, start_y{0};
+};
+
+// How the component learns about new source data
+enum UpdateMode {
+  UPDATE_MODE_POLL,     // Check the source on every loop() pass
+  UPDATE_MODE_INTERRUPT // Only process when the source reports new data
+};
+
+// When a new touch may reach consumers
+enum DebounceMode {
+  DEBOUNCE_MODE_PASSTHROUGH, // Forward at once, filter ghost taps on release
+  DEBOUNCE_MODE_HOLD         // Hold back until it persisted debounce_threshold
+};
+
+// Which point goes out when max_report_rate coalesces samples
+enum ReportMode {
+  REPORT_MODE_LATEST, // The newest sample
+  REPORT_MODE_AVERAGE // Mean of the samples since the last report
+};
+
+// Low-power command sent to the source's touch chip in controller sleep
+enum SleepController {
+  SLEEP_CONTROLLER_NONE,   // Soft sleep only
+  SLEEP_CONTROLLER_GT911,  // 0x05 -> 0x8040
+  SLEEP_CONTROLLER_CST816  // 0x03 -> 0xA5
+};
+
+// What an idle stage does to the component besides firing its trigger
+enum IdleState {
+  IDLE_STATE_AWAKE,         // Trigger only (e.g. dim the backlight)
+  IDLE_STATE_SLEEP,         // Sleep: wake click suppression, source throttled
+  IDLE_STATE_CONTROLLER_OFF // Sleep and send the controller's sleep command
+};
+
+// One step of the idle timeline, entered timeout ms after the last touch
+struct IdleStage {
+  uint32_t timeout;
+  IdleState state;
+  Trigger<> *trigger;
+};
+
+#ifdef USE_SENTIO_METRICS
+// Pipeline stages timed in metrics mode
+enum MetricStage {
+  METRIC_STAGE_CALIBRATION, // Median filter + affine/grid calibration
+  METRIC_STAGE_FILTER,      // One-Euro smoothing
+  METRIC_STAGE_GESTURES,    // Single and two-finger gesture engine
+  METRIC_STAGE_FRAME,       // Whole loop() pass for a touch or release frame
+  METRIC_STAGE_LATENCY,     // Source report -> add_raw_touch_position_()
+  METRIC_STAGE_COUNT
+};
+
+enum MetricStat {
+  METRIC_STAT_MIN,
+  METRIC_STAT_AVG,
+  METRIC_STAT_MAX,
+  METRIC_STAT_P99,
+  METRIC_STAT_COUNT
+};
+
+static const uint8_t METRIC_BUCKETS = 64;
+
+// Durations (us) of one stage since the last publish. Log-linear buckets:
+// exact below 16 us, then 4 per power of two, so p99 is within ~20%.
+struct StageHistogram {
+  uint32_t count{0};
+  uint32_t min{UINT32_MAX};
+  uint32_t max{0};
+  uint64_t sum{0};
+  uint16_t buckets[METRIC_BUCKETS]{};
+
+  void add(uint32_t us);
+  uint32_t percentile(uint8_t pct) const;
+  void reset() { *this = StageHistogram(); }
+};
+#endif
+
+// Flags the component whenever the source driver publishes touches.
+// The source calls this from its own loop(), so a plain bool is enough.
+class SourceListener : public touchscreen::TouchListener {
+public:
+  explicit SourceListener(bool *pending) : pending_(pending) {}
+  void update(const touchscreen::TouchPoints_t &tpoints) override {
+    this->mark_pending();
+  }
+  void release() override { this->mark_pending(); }
+
+#ifdef USE_SENTIO_METRICS
+  uint32_t report_time{0}; // micros() of the oldest unprocessed report
+#endif
+
+protected:
+  void mark_pending() {
+#ifdef USE_SENTIO_METRICS
+    if (!*this->pending_)
+      this->report_time = micros();
+#endif
+    *this->pending_ = true;
+  }
+
+  bool *pending_;
 };
 
 class SmartTouchComponent : public touchscreen::Touchscreen, public Component {
@@ -20,27 +210,168 @@ public:
   void set_source_driver(touchscreen::Touchscreen *source) {
     source_driver_ = source;
   }
+  // Calibrated (output) resolution, used to clamp the transformed point
   void set_resolution(int w, int h) {
     display_width_ = w;
     display_height_ = h;
   }
-  void set_sleep_timeout(uint32_t t) { sleep_timeout_ms_ = t; }
+  // Idle timeline, stages added in increasing timeout order
+  void add_idle_stage(uint32_t timeout, IdleState state, Trigger<> *trigger = nullptr) {
+    idle_stages_.push_back({timeout, state, trigger});
+  }
+  // Single stage timeline: sleep after t ms
+  void set_sleep_timeout(uint32_t t) { add_idle_stage(t, IDLE_STATE_SLEEP); }
   void set_suppress_wake_click(bool b) { suppress_wake_click_ = b; }
-  void set_calibration(bool swap, bool inv_x, bool inv_y) {
-    swap_xy_ = swap;
-    invert_x_ = inv_x;
-    invert_y_ = inv_y;
+  // Source update interval while asleep, SCHEDULER_DONT_RUN stops polling
+  // (the controller's INT pin wakes it), 0 leaves the source alone
+  void set_sleep_update_interval(uint32_t ms) { sleep_update_interval_ = ms; }
+#ifdef USE_SENTIO_CONTROLLER_SLEEP
+  // Controller sleep: the source's chip is put to sleep over I2C and woken
+  // by a reset through the source's pins, touches can't wake it
+  void set_sleep_controller(SleepController controller, i2c::I2CDevice *device,
+                            GPIOPin *reset_pin) {
+    controller_ = controller;
+    controller_device_ = device;
+    controller_reset_pin_ = reset_pin;
+  }
+  // The source's INT pin, driven low through the reset to strap the GT911's
+  // I2C address
+  void set_controller_interrupt_pin(InternalGPIOPin *pin) { controller_interrupt_pin_ = pin; }
+#endif
+#ifdef USE_SENTIO_LIGHT_SLEEP
+  // Light sleep while asleep: woken by the source's INT pin going active, or
+  // after max_duration so the scheduler still runs (WiFi/BT don't survive
+  // it, the codegen refuses them)
+  void set_light_sleep(uint8_t interrupt_pin, uint32_t max_duration_ms) {
+    light_sleep_pin_ = interrupt_pin;
+    light_sleep_max_ms_ = max_duration_ms;
+  }
+#endif
+  // Affine transform in Q16.16 fixed point, precomputed by the codegen:
+  //   x' = (a * x + b * y + c) >> 16
+  //   y' = (d * x + e * y + f) >> 16
+  void set_calibration(int32_t a, int32_t b, int32_t c, int32_t d, int32_t e,
+                       int32_t f) {
+    calibration_[0] = a;
+    calibration_[1] = b;
+    calibration_[2] = c;
+    calibration_[3] = d;
+    calibration_[4] = e;
+    calibration_[5] = f;
+  }
+  // Nonlinear correction: columns x rows grid of (dx, dy) offsets in 1/16 px,
+  // stored in flash and bilinearly interpolated over the display area
+  void set_calibration_grid(const int16_t *offsets, uint8_t columns,
+                            uint8_t rows) {
+    grid_ = offsets;
+    grid_columns_ = columns;
+    grid_rows_ = rows;
+  }
+  // Touches start at min_pressure and end below release_pressure (hysteresis)
+  void set_pressure_thresholds(uint16_t min_pressure, uint16_t release_pressure) {
+    min_pressure_ = min_pressure;
+    release_pressure_ = release_pressure;
+  }
+  // Median of the last 3 or 5 raw samples per finger, 0 disables
+  void set_median_window(uint8_t n) { median_window_ = n; }
+  // One-Euro jitter filter: cutoffs in mHz, beta in uHz per px/s
+  void set_smoothing(uint32_t min_cutoff, uint32_t beta,
+                     uint32_t derivative_cutoff) {
+    smooth_min_cutoff_ = min_cutoff;
+    smooth_beta_ = beta;
+    smooth_derivative_cutoff_ = derivative_cutoff;
   }
   void set_debounce_threshold(uint32_t ms) { debounce_ms_ = ms; }
-  void set_debug_raw(bool b) { debug_raw_ = b; }
+  void set_debounce_mode(DebounceMode mode) { debounce_mode_ = mode; }
+  // Minimum time between published moves, 0 = every frame
+  void set_report_interval(uint32_t ms) { report_interval_ms_ = ms; }
+  void set_report_mode(ReportMode mode) { report_mode_ = mode; }
+  // Moves within this many pixels of the last published point are not
+  // republished (0 = only exact repeats are dropped)
+  void set_movement_deadband(uint8_t px) { deadband_ = px; }
+  void set_swipe_threshold(int px) { swipe_threshold_ = px; }
+  void set_swipe_min_velocity(uint32_t px_per_s) {
+    swipe_min_velocity_ = px_per_s;
+  }
+  // Dominant / other axis ratio a swipe needs, Q8 (256 = 1.0)
+  void set_swipe_axis_ratio(uint32_t ratio) { swipe_axis_ratio_ = ratio; }
+  void set_tap_max_duration(uint32_t ms) { tap_max_duration_ = ms; }
+  void set_long_press_time(uint32_t ms) { long_press_ms_ = ms; }
+  void set_hold_repeat_interval(uint32_t ms) { hold_repeat_ms_ = ms; }
+  void set_double_tap_window(uint32_t ms) { double_tap_window_ms_ = ms; }
+  void set_update_mode(UpdateMode mode) { update_mode_ = mode; }
+#ifdef USE_SENTIO_DEBUG_RAW
+  // Log every Nth frame, optionally only when the raw point moved, and/or a
+  // once-a-second summary
+  void set_debug_raw(uint16_t every, bool on_change, bool summary) {
+    debug_every_ = every;
+    debug_on_change_ = on_change;
+    debug_summary_ = summary;
+  }
+#endif
 
   // --- Triggers (Automation hooks) ---
   Trigger<> *get_trigger(const std::string &conf);
   void set_on_swipe_left(Trigger<> *t) { on_swipe_left_ = t; }
   void set_on_swipe_right(Trigger<> *t) { on_swipe_right_ = t; }
+  void set_on_swipe_up(Trigger<> *t) { on_swipe_up_ = t; }
+  void set_on_swipe_down(Trigger<> *t) { on_swipe_down_ = t; }
   void set_on_tap(Trigger<> *t) { on_tap_ = t; }
+  void set_on_double_tap(Trigger<> *t) { on_double_tap_ = t; }
+  void set_on_long_press(Trigger<> *t) { on_long_press_ = t; }
+  void set_on_hold_repeat(Trigger<> *t) { on_hold_repeat_ = t; }
   void set_on_wake(Trigger<> *t) { on_wake_ = t; }
   void set_on_sleep(Trigger<> *t) { on_sleep_ = t; }
+  // Scale delta in Q8 (256 = unchanged) since the previous pinch event
+  void set_on_pinch(Trigger<int32_t> *t) { on_pinch_ = t; }
+  // Angle delta in 0.1 degree (positive = clockwise) since the previous event
+  void set_on_rotate(Trigger<int32_t> *t) { on_rotate_ = t; }
+
+  // --- Diagnostics ---
+  // Delay between first contact and first publish (ms) of the latest touch
+  uint32_t get_publish_latency() const { return publish_latency_; }
+  uint32_t get_max_publish_latency() const { return max_publish_latency_; }
+  // Touches dropped by the debounce filter
+  uint32_t get_ghost_touches() const { return ghost_touches_; }
+  // Frames not republished because the point stayed inside the deadband
+  uint32_t get_suppressed_frames() const { return suppressed_frames_; }
+  // Frames held back (merged into the next report) by max_report_rate
+  uint32_t get_coalesced_frames() const { return coalesced_frames_; }
+
+#ifdef USE_SENTIO_METRICS
+  // --- Metrics (stage timings in us, published every interval) ---
+  void set_metrics_interval(uint32_t ms) { metrics_interval_ms_ = ms; }
+  void set_metric_sensor(MetricStage stage, MetricStat stat, sensor::Sensor *s) {
+    metric_sensors_[stage][stat] = s;
+  }
+  // Current (unpublished) window of a stage
+  const StageHistogram &get_metric(MetricStage stage) const {
+    return metrics_[stage];
+  }
+#endif
+
+  // --- Power ---
+  // Leave the idle timeline (sleep included) or restart it from an
+  // automation, the only way out of controller sleep
+  void wake();
+  bool is_sleeping() const { return is_sleeping_; }
+
+  // --- Trace Recorder ---
+  // Logs the recorded frames as base64 lines between "TRACE BEGIN" and
+  // "TRACE END", oldest first (decode with bench/decode_trace.py)
+  void dump_trace();
+
+  // --- History (newest first, for lambdas) ---
+  // Samples stored so far, up to history_size
+  uint8_t get_history_count() const { return history_count_; }
+  // age 0 is the newest sample, age must be below get_history_count()
+  const TouchSample &get_history(uint8_t age) const {
+    uint8_t index = (history_head_ + SENTIO_HISTORY_SIZE - 1 - age) % SENTIO_HISTORY_SIZE;
+    return history_[index];
+  }
+  // Average velocity (px/s) of a finger over the last window_ms, false if
+  // the history holds fewer than two samples of it in that window
+  bool get_velocity(uint8_t id, uint32_t window_ms, int32_t &vx, int32_t &vy) const;
 
   // --- Lifecycle ---
   void setup() override;
@@ -52,31 +383,208 @@ protected:
 
   // Config Variables
   int display_width_, display_height_;
-  uint32_t sleep_timeout_ms_;
-  bool suppress_wake_click_, swap_xy_, invert_x_, invert_y_, debug_raw_;
+  std::vector<IdleStage> idle_stages_;
+  uint32_t sleep_update_interval_{0};
+  uint32_t awake_update_interval_{0}; // Restored on wake, 0 = not throttled
+#ifdef USE_SENTIO_CONTROLLER_SLEEP
+  SleepController controller_{SLEEP_CONTROLLER_NONE};
+  i2c::I2CDevice *controller_device_{nullptr};
+  GPIOPin *controller_reset_pin_{nullptr};     // Owned by the source
+  InternalGPIOPin *controller_interrupt_pin_{nullptr};
+#ifdef USE_ESP32
+  gpio_int_type_t controller_interrupt_type_{GPIO_INTR_DISABLE}; // Source's edge
+#endif
+#endif
+#ifdef USE_SENTIO_LIGHT_SLEEP
+  uint8_t light_sleep_pin_{0};
+  uint32_t light_sleep_max_ms_{1000};
+#endif
+  bool suppress_wake_click_;
+  int32_t calibration_[6]{1 << 16, 0, 0, 0, 1 << 16, 0}; // Identity
+  const int16_t *grid_{nullptr};
+  uint8_t grid_columns_{0}, grid_rows_{0};
+  uint32_t grid_scale_x_{0}, grid_scale_y_{0}; // Pixels -> grid cells, Q16
+  uint16_t min_pressure_{0};      // 0 = gate disabled
+  uint16_t release_pressure_{0};
+  uint8_t median_window_{0};      // 0 = filter disabled
+  uint32_t smooth_min_cutoff_{0}; // 0 = filter disabled
+  uint32_t smooth_beta_{0};
+  uint32_t smooth_derivative_cutoff_{0};
   uint32_t debounce_ms_;
+  DebounceMode debounce_mode_{DEBOUNCE_MODE_HOLD};
+  uint8_t deadband_{0};
+  uint32_t report_interval_ms_{0};
+  ReportMode report_mode_{REPORT_MODE_LATEST};
+  int swipe_threshold_{30};          // Pixels to trigger a swipe
+  uint32_t swipe_min_velocity_{0};   // px/s, slower drags are scrolls
+  uint32_t swipe_axis_ratio_{256};   // Q8
+  uint32_t tap_max_duration_{800};   // Max ms for a tap (otherwise it's a hold)
+  uint32_t long_press_ms_{800};
+  uint32_t hold_repeat_ms_{200};
+  uint32_t double_tap_window_ms_{300};
+  UpdateMode update_mode_{UPDATE_MODE_POLL};
 
   // Runtime State
-  uint32_t last_activity_time_{0};
+  uint32_t last_report_time_{0};
   bool is_sleeping_{false};
+  uint8_t idle_stage_{0}; // Next stage of the timeline, 0 = fully awake
+  bool idle_paused_{false}; // A finger is down, the timeline restarts on release
   bool ignore_next_release_{false}; // The Trap Flag
+#ifdef USE_SENTIO_CONTROLLER_SLEEP
+  bool controller_asleep_{false}; // Sleep command acknowledged, needs a reset
+  bool controller_strapped_{false}; // INT driven low by a reset in flight
+#endif
+#ifdef USE_SENTIO_LIGHT_SLEEP
+  bool wake_pending_{false}; // Woken by INT, waiting for the source to report
+  bool light_sleep_warned_{false};
+#endif
 
-  // Gesture State
-  TouchState state_{STATE_IDLE};
-  uint32_t gesture_start_time_{0};
-  int16_t start_x_{0}, start_y_{0};
+  // Debounce Statistics
+  uint32_t publish_latency_{0};
+  uint32_t max_publish_latency_{0};
+  uint32_t ghost_touches_{0};
+  uint32_t suppressed_frames_{0};
+  uint32_t coalesced_frames_{0};
+
+#ifdef USE_SENTIO_DEBUG_RAW
+  // Raw Touch Debugging
+  uint16_t debug_every_{1};
+  bool debug_on_change_{false};
+  bool debug_summary_{false};
+  uint32_t debug_frames_{0}; // Counted for the summary, reset every second
+  uint32_t debug_lines_{0};
+  int16_t debug_min_x_{INT16_MAX}, debug_max_x_{INT16_MIN};
+  int16_t debug_min_y_{INT16_MAX}, debug_max_y_{INT16_MIN};
+#endif
+
+  // Interrupt Mode
+  bool data_pending_{false};
+  SourceListener listener_{&data_pending_};
+
+  // Sample History (fixed ring, no allocation)
+  TouchSample history_[SENTIO_HISTORY_SIZE];
+  uint8_t history_head_{0}; // Next slot to write
+  uint8_t history_count_{0};
+
+#ifdef USE_SENTIO_METRICS
+  // Metrics
+  StageHistogram metrics_[METRIC_STAGE_COUNT];
+  sensor::Sensor *metric_sensors_[METRIC_STAGE_COUNT][METRIC_STAT_COUNT]{};
+  uint32_t metrics_interval_ms_{10000};
+  uint32_t frame_report_us_{0}; // When the source reported the current frame
+#endif
+
+#ifdef USE_SENTIO_TRACE
+  // Trace Recorder (fixed ring, no allocation)
+  TraceRecord trace_[SENTIO_TRACE_SIZE];
+  uint16_t trace_head_{0}; // Next record to write
+  uint16_t trace_count_{0};
+  uint16_t trace_frame_{0}; // First record of the current frame
+#endif
+
+  // Touch Slots (fixed size, no allocation)
+  TouchSlot slots_[SENTIO_MAX_TOUCHES];
+  uint8_t active_slots_{0};
+  uint32_t frame_{0};
+  uint32_t frame_time_{0}; // millis() of the current frame, read once
+
+#ifdef USE_SENTIO_GESTURES
+  // Timed Gesture State (driven by the scheduler, not polled)
+  TouchSlot *hold_slot_{nullptr}; // Finger the long-press timer belongs to
+  bool tap_pending_{false};       // First tap waiting for a double tap
+  int16_t tap_x_{0}, tap_y_{0};
+#endif
+
+#ifdef USE_SENTIO_MULTI_TOUCH
+  // Two-Finger Gesture State (integer only, no trig per frame)
+  bool multi_touch_{false};
+  uint32_t landings_{0};              // Fingers put down so far (slot landed)
+  uint8_t pair_a_id_{0}, pair_b_id_{0}; // Ids of the two fingers tracked
+  int32_t pinch_distance_{0};         // Finger distance at the last pinch event
+  int32_t rotate_ref_x_{0}, rotate_ref_y_{0}; // Finger vector at the last rotate event
+#endif
 
   // Triggers
   Trigger<> *on_swipe_left_{nullptr};
   Trigger<> *on_swipe_right_{nullptr};
+  Trigger<> *on_swipe_up_{nullptr};
+  Trigger<> *on_swipe_down_{nullptr};
   Trigger<> *on_tap_{nullptr};
+  Trigger<> *on_double_tap_{nullptr};
+  Trigger<> *on_long_press_{nullptr};
+  Trigger<> *on_hold_repeat_{nullptr};
   Trigger<> *on_wake_{nullptr};
   Trigger<> *on_sleep_{nullptr};
+  Trigger<int32_t> *on_pinch_{nullptr};
+  Trigger<int32_t> *on_rotate_{nullptr};
 
   // Helpers
+  bool pressure_ok(const touchscreen::TouchPoint &p);
+  void apply_median(TouchSlot &slot, touchscreen::TouchPoint &p);
   touchscreen::TouchPoint apply_calibration(touchscreen::TouchPoint p);
-  void process_gestures(touchscreen::TouchPoint p);
-  void handle_release();
+  void apply_grid_correction(int32_t &x, int32_t &y);
+  void apply_smoothing(TouchSlot &slot, touchscreen::TouchPoint &p);
+  void record_sample(const touchscreen::TouchPoint &p);
+#ifdef USE_SENTIO_DEBUG_RAW
+  void log_raw(TouchSlot &slot, const touchscreen::TouchPoint &raw,
+               const touchscreen::TouchPoint &p);
+  void log_raw_summary();
+#endif
+#ifdef USE_SENTIO_TRACE
+  TraceRecord &record_trace();
+#endif
+  TouchSlot *find_slot(uint8_t id);
+  void release_slot(TouchSlot &slot);
+  bool start_publishing(TouchSlot &slot);
+  void publish_point(TouchSlot &slot, const touchscreen::TouchPoint &p);
+  void publish_held();
+  void process_gestures(TouchSlot &slot, touchscreen::TouchPoint p);
+  void handle_release(TouchSlot &slot);
+#ifdef USE_SENTIO_MULTI_TOUCH
+  void process_multi_touch();
+#endif
+#ifdef USE_SENTIO_GESTURES
+  void arm_hold(TouchSlot &slot);
+  void cancel_hold();
+  void emit_tap(const TouchSlot &slot);
+#endif
+#ifdef USE_SENTIO_METRICS
+  void publish_metrics();
+#endif
+  void enter_idle_stage(const IdleStage &stage);
+  void enter_sleep();
+  void wake_up();
+  void throttle_source(uint32_t interval);
+  void restore_source();
+#ifdef USE_SENTIO_CONTROLLER_SLEEP
+  void controller_off();
+  bool send_sleep_command();
+  void reset_controller();
+  void release_interrupt_pin();
+#endif
+#ifdef USE_SENTIO_LIGHT_SLEEP
+  void light_sleep();
+#endif
+  void restart_idle();
+  void schedule_idle(uint32_t delay);
+};
+
+template<typename... Ts> class DumpTraceAction : public Action<Ts...> {
+public:
+  explicit DumpTraceAction(SmartTouchComponent *parent) : parent_(parent) {}
+  void play(Ts... x) override { this->parent_->dump_trace(); }
+
+protected:
+  SmartTouchComponent *parent_;
+};
+
+template<typename... Ts> class WakeAction : public Action<Ts...> {
+public:
+  explicit WakeAction(SmartTouchComponent *parent) : parent_(parent) {}
+  void play(Ts... x) override { this->parent_->wake(); }
+
+protected:
+  SmartTouchComponent *parent_;
 };
 
 } // namespace sentio
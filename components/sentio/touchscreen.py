@@ -1,8 +1,31 @@
+import logging
+
 import esphome.codegen as cg
 import esphome.config_validation as cv
+import esphome.final_validate as fv
 from esphome import automation
-from esphome.components import touchscreen
-from esphome.const import CONF_ID, CONF_SOURCE, CONF_OUTPUT_ID
+from esphome.components import sensor, touchscreen
+from esphome.const import (
+    CONF_ID,
+    CONF_INTERRUPT_PIN,
+    CONF_NUMBER,
+    CONF_SOURCE,
+    CONF_OUTPUT_ID,
+    CONF_PLATFORM,
+    CONF_RESET_PIN,
+    CONF_STATE,
+    CONF_TIMEOUT,
+    CONF_TRIGGER_ID,
+    CONF_UPDATE_INTERVAL,
+    ENTITY_CATEGORY_DIAGNOSTIC,
+    STATE_CLASS_MEASUREMENT,
+)
+from esphome.core import CORE
+
+_LOGGER = logging.getLogger(__name__)
+
+# Stage timing sensors (metrics); the C++ side stays behind USE_SENTIO_METRICS
+AUTO_LOAD = ["sensor"]
 
 # Namespace - Use global namespace sentio
 # Note: external components are loaded into 'esphome.components.<name>' by the loader dynamically,
@@ -10,25 +33,450 @@ from esphome.const import CONF_ID, CONF_SOURCE, CONF_OUTPUT_ID
 sentio_ns = cg.esphome_ns.namespace('sentio')
 SmartTouchComponent = sentio_ns.class_('SmartTouchComponent', touchscreen.Touchscreen, cg.Component)
 
+# Actions
+DumpTraceAction = sentio_ns.class_("DumpTraceAction", automation.Action)
+WakeAction = sentio_ns.class_("WakeAction", automation.Action)
+
 # Configuration Constants
 CONF_DISPLAY_WIDTH = "display_width"
 CONF_DISPLAY_HEIGHT = "display_height"
 CONF_SLEEP_TIMEOUT = "sleep_timeout"
+CONF_IDLE_STAGES = "idle_stages"
 CONF_SUPPRESS_WAKE_CLICK = "suppress_wake_click"
+CONF_SLEEP_UPDATE_INTERVAL = "sleep_update_interval"
+CONF_SLEEP_STRATEGY = "sleep_strategy"
+CONF_LIGHT_SLEEP = "light_sleep"
+CONF_MAX_DURATION = "max_duration"
 CONF_SWAP_XY = "swap_xy"
 CONF_INVERT_X = "invert_x"
 CONF_INVERT_Y = "invert_y"
+CONF_CALIBRATION_MATRIX = "calibration_matrix"
+CONF_CALIBRATION_POINTS = "calibration_points"
+CONF_RAW = "raw"
+CONF_SCREEN = "screen"
+CONF_CALIBRATION_GRID = "calibration_grid"
+CONF_COLUMNS = "columns"
+CONF_ROWS = "rows"
+CONF_MEASURED = "measured"
+CONF_GRID_DATA_ID = "grid_data_id"
 CONF_DEBOUNCE_THRESHOLD = "debounce_threshold"
+CONF_DEBOUNCE_MODE = "debounce_mode"
+CONF_MOVEMENT_DEADBAND = "movement_deadband"
+CONF_MAX_REPORT_RATE = "max_report_rate"
+CONF_REPORT_MODE = "report_mode"
+CONF_MIN_PRESSURE = "min_pressure"
+CONF_RELEASE_PRESSURE = "release_pressure"
+CONF_MEDIAN_FILTER = "median_filter"
+CONF_SMOOTHING = "smoothing"
+CONF_MIN_CUTOFF = "min_cutoff"
+CONF_BETA = "beta"
+CONF_DERIVATIVE_CUTOFF = "derivative_cutoff"
+CONF_SWIPE_THRESHOLD = "swipe_threshold"
+CONF_SWIPE_MIN_VELOCITY = "swipe_min_velocity"
+CONF_SWIPE_AXIS_RATIO = "swipe_axis_ratio"
+CONF_TAP_MAX_DURATION = "tap_max_duration"
+CONF_LONG_PRESS_TIME = "long_press_time"
+CONF_HOLD_REPEAT_INTERVAL = "hold_repeat_interval"
+CONF_DOUBLE_TAP_WINDOW = "double_tap_window"
 CONF_DEBUG_RAW = "debug_raw_touch"
+CONF_EVERY = "every"
+CONF_ON_CHANGE = "on_change"
+CONF_SUMMARY = "summary"
+CONF_UPDATE_MODE = "update_mode"
+CONF_MAX_TOUCHES = "max_touches"
+CONF_HISTORY_SIZE = "history_size"
+CONF_METRICS = "metrics"
+CONF_TRACE_BUFFER_SIZE = "trace_buffer_size"
+
+# Update Modes
+UpdateMode = sentio_ns.enum("UpdateMode")
+UPDATE_MODES = {
+    "poll": UpdateMode.UPDATE_MODE_POLL,
+    "interrupt": UpdateMode.UPDATE_MODE_INTERRUPT,
+}
+
+# Debounce Modes
+DebounceMode = sentio_ns.enum("DebounceMode")
+DEBOUNCE_MODES = {
+    "passthrough": DebounceMode.DEBOUNCE_MODE_PASSTHROUGH,
+    "hold": DebounceMode.DEBOUNCE_MODE_HOLD,
+}
+
+# Report Modes (what max_report_rate publishes for coalesced samples)
+ReportMode = sentio_ns.enum("ReportMode")
+REPORT_MODES = {
+    "latest": ReportMode.REPORT_MODE_LATEST,
+    "average": ReportMode.REPORT_MODE_AVERAGE,
+}
+
+# Sleep Strategies: soft only throttles polling, controller also puts the
+# touch chip into its low-power mode (needs the source's reset_pin to get
+# it back)
+SLEEP_STRATEGIES = ["soft", "controller", "auto"]
+
+# Components that need the radio up while the ESP32 is in light sleep
+LIGHT_SLEEP_CONFLICTS = ["wifi", "api", "esp32_ble", "esp32_ble_tracker", "bluetooth_proxy"]
+
+# Source platforms with a known sleep command
+SleepController = sentio_ns.enum("SleepController")
+SLEEP_CONTROLLERS = {
+    "gt911": SleepController.SLEEP_CONTROLLER_GT911,
+    "cst816": SleepController.SLEEP_CONTROLLER_CST816,
+}
+
+# Idle Stage States (what a stage does besides firing on_enter)
+IdleState = sentio_ns.enum("IdleState")
+IDLE_STATES = {
+    "awake": IdleState.IDLE_STATE_AWAKE,
+    "sleep": IdleState.IDLE_STATE_SLEEP,
+    "controller_off": IdleState.IDLE_STATE_CONTROLLER_OFF,
+}
+DEFAULT_SLEEP_TIMEOUT = "30s"
+
+# Metrics: timed pipeline stages and the statistics published for each
+MetricStage = sentio_ns.enum("MetricStage")
+METRIC_STAGES = {
+    "calibration": MetricStage.METRIC_STAGE_CALIBRATION,
+    "filter": MetricStage.METRIC_STAGE_FILTER,
+    "gestures": MetricStage.METRIC_STAGE_GESTURES,
+    "frame": MetricStage.METRIC_STAGE_FRAME,
+    "latency": MetricStage.METRIC_STAGE_LATENCY,
+}
+MetricStat = sentio_ns.enum("MetricStat")
+METRIC_STATS = {
+    "min": MetricStat.METRIC_STAT_MIN,
+    "avg": MetricStat.METRIC_STAT_AVG,
+    "max": MetricStat.METRIC_STAT_MAX,
+    "p99": MetricStat.METRIC_STAT_P99,
+}
+UNIT_MICROSECOND = "µs"
+
+# cv.update_interval("never"), the scheduler's "don't run" interval
+SCHEDULER_DONT_RUN = 4294967295
+
+# Calibration coefficients are emitted as Q16.16 fixed point
+CALIBRATION_SHIFT = 16
+
+# Fits with a worse worst-case error than this (pixels) are flagged
+CALIBRATION_MAX_RESIDUAL = 4.0
+
+# Grid correction offsets are stored in 1/16 px, up to this many px
+GRID_SHIFT = 4
+GRID_MAX_OFFSET = 127
 
 # Triggers
 CONF_ON_SWIPE_LEFT = "on_swipe_left"
 CONF_ON_SWIPE_RIGHT = "on_swipe_right"
+CONF_ON_SWIPE_UP = "on_swipe_up"
+CONF_ON_SWIPE_DOWN = "on_swipe_down"
 CONF_ON_TAP = "on_tap"
+CONF_ON_DOUBLE_TAP = "on_double_tap"
+CONF_ON_LONG_PRESS = "on_long_press"
+CONF_ON_HOLD_REPEAT = "on_hold_repeat"
 CONF_ON_WAKE = "on_wake"
 CONF_ON_SLEEP = "on_sleep"
+CONF_ON_PINCH = "on_pinch"
+CONF_ON_ROTATE = "on_rotate"
+CONF_ON_ENTER = "on_enter"
+
+# Triggers that need the single-finger gesture engine (USE_SENTIO_GESTURES)
+SINGLE_TOUCH_GESTURES = (
+    CONF_ON_SWIPE_LEFT,
+    CONF_ON_SWIPE_RIGHT,
+    CONF_ON_SWIPE_UP,
+    CONF_ON_SWIPE_DOWN,
+    CONF_ON_TAP,
+    CONF_ON_DOUBLE_TAP,
+    CONF_ON_LONG_PRESS,
+    CONF_ON_HOLD_REPEAT,
+)
+
+def validate_calibration_matrix(value):
+    value = cv.ensure_list(cv.float_)(value)
+    if len(value) != 6:
+        raise cv.Invalid("calibration_matrix needs exactly 6 values [a, b, c, d, e, f]")
+    for v in value:
+        if abs(v) >= 1 << (31 - CALIBRATION_SHIFT):
+            raise cv.Invalid(f"calibration_matrix value {v} is out of the fixed-point range")
+    return value
+
+
+def orientation_matrix(config):
+    """Fold swap_xy / invert_x / invert_y into a 2x3 affine matrix.
+
+    Returns the matrix and the calibrated (output) resolution.
+    """
+    width = config[CONF_DISPLAY_WIDTH]
+    height = config[CONF_DISPLAY_HEIGHT]
+    if config[CONF_SWAP_XY]:
+        # If swapped, x is now relative to the *height* dimension
+        matrix = [[0.0, 1.0, 0.0], [1.0, 0.0, 0.0]]
+        width, height = height, width
+    else:
+        matrix = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+    if config[CONF_INVERT_X]:
+        matrix[0] = [-matrix[0][0], -matrix[0][1], width - 1]
+    if config[CONF_INVERT_Y]:
+        matrix[1] = [-matrix[1][0], -matrix[1][1], height - 1]
+    return matrix, width, height
+
+
+def compose(outer, inner):
+    """Affine matrix that applies `inner` first, then `outer`."""
+    return [
+        [
+            outer[r][0] * inner[0][c] + outer[r][1] * inner[1][c] + (outer[r][2] if c == 2 else 0.0)
+            for c in range(3)
+        ]
+        for r in range(2)
+    ]
+
+
+def to_fixed(matrix):
+    """Convert a 2x3 float matrix to the six Q16.16 set_calibration() arguments."""
+    one = 1 << CALIBRATION_SHIFT
+    coeffs = []
+    for row in matrix:
+        coeffs += [int(round(v * one)) for v in row]
+        # Bias the offset by half a pixel so the runtime shift rounds to nearest
+        coeffs[-1] += one >> 1
+    return coeffs
+
+
+def fit_affine(points):
+    """Least-squares affine fit of raw -> screen reference point pairs.
+
+    Solves the 3x3 normal equations for both output axes at once. Returns the
+    2x3 matrix and the per-point residual distance in pixels.
+    """
+    ata = [[0.0] * 3 for _ in range(3)]
+    atb = [[0.0] * 2 for _ in range(3)]
+    for point in points:
+        row = [point[CONF_RAW][0], point[CONF_RAW][1], 1.0]
+        for i in range(3):
+            for j in range(3):
+                ata[i][j] += row[i] * row[j]
+            atb[i][0] += row[i] * point[CONF_SCREEN][0]
+            atb[i][1] += row[i] * point[CONF_SCREEN][1]
+
+    # Gauss-Jordan elimination with partial pivoting
+    for col in range(3):
+        pivot = max(range(col, 3), key=lambda r: abs(ata[r][col]))
+        if abs(ata[pivot][col]) < 1e-9:
+            raise cv.Invalid(
+                "calibration_points are degenerate (collinear or repeated), "
+                "use at least 3 points spread over the screen"
+            )
+        ata[col], ata[pivot] = ata[pivot], ata[col]
+        atb[col], atb[pivot] = atb[pivot], atb[col]
+        for r in range(3):
+            if r == col:
+                continue
+            k = ata[r][col] / ata[col][col]
+            ata[r] = [a - k * b for a, b in zip(ata[r], ata[col])]
+            atb[r] = [a - k * b for a, b in zip(atb[r], atb[col])]
+    matrix = [[atb[i][axis] / ata[i][i] for i in range(3)] for axis in range(2)]
+
+    residuals = []
+    for point in points:
+        rx, ry = point[CONF_RAW]
+        sx = matrix[0][0] * rx + matrix[0][1] * ry + matrix[0][2]
+        sy = matrix[1][0] * rx + matrix[1][1] * ry + matrix[1][2]
+        residuals.append(((sx - point[CONF_SCREEN][0]) ** 2 + (sy - point[CONF_SCREEN][1]) ** 2) ** 0.5)
+    return matrix, residuals
+
+
+def validate_calibration(config):
+    if CONF_CALIBRATION_GRID in config:
+        _, width, height = orientation_matrix(config)
+        worst = max(abs(v) for v in grid_offsets(config[CONF_CALIBRATION_GRID], width, height))
+        if worst > GRID_MAX_OFFSET << GRID_SHIFT:
+            raise cv.Invalid(
+                f"calibration_grid corrects by up to {worst >> GRID_SHIFT} px, at most {GRID_MAX_OFFSET} px is supported"
+            )
+    if CONF_CALIBRATION_POINTS not in config:
+        return config
+    for key in (CONF_SWAP_XY, CONF_INVERT_X, CONF_INVERT_Y):
+        if config[key]:
+            raise cv.Invalid(f"{key} cannot be combined with {CONF_CALIBRATION_POINTS}, the fit already covers orientation")
+
+    matrix, residuals = fit_affine(config[CONF_CALIBRATION_POINTS])
+    for v in (v for row in matrix for v in row):
+        if abs(v) >= 1 << (31 - CALIBRATION_SHIFT):
+            raise cv.Invalid(f"Fitted calibration coefficient {v} is out of the fixed-point range")
+    rms = (sum(r * r for r in residuals) / len(residuals)) ** 0.5
+    worst = max(residuals)
+    _LOGGER.info(
+        "Sentio calibration fit over %d points: rms error %.2f px, max error %.2f px",
+        len(residuals), rms, worst,
+    )
+    if worst > CALIBRATION_MAX_RESIDUAL:
+        _LOGGER.warning(
+            "Sentio calibration point %d is %.1f px off the fitted transform, check the reference points",
+            residuals.index(worst), worst,
+        )
+    return config
+
+
+def grid_offsets(grid, width, height):
+    """Correction offsets for each grid node, interleaved dx, dy in 1/16 px.
+
+    Nodes are spread evenly over the calibrated area. `measured` holds the
+    position Sentio reported when each node was touched, row by row.
+    """
+    columns, rows = grid[CONF_COLUMNS], grid[CONF_ROWS]
+    offsets = []
+    for index, (mx, my) in enumerate(grid[CONF_MEASURED]):
+        ex = (index % columns) * (width - 1) / (columns - 1)
+        ey = (index // columns) * (height - 1) / (rows - 1)
+        offsets += [int(round((ex - mx) * (1 << GRID_SHIFT))), int(round((ey - my) * (1 << GRID_SHIFT)))]
+    return offsets
+
+
+def validate_calibration_grid(grid):
+    expected = grid[CONF_COLUMNS] * grid[CONF_ROWS]
+    if len(grid[CONF_MEASURED]) != expected:
+        raise cv.Invalid(
+            f"calibration_grid needs {expected} measured points ({grid[CONF_COLUMNS]} columns x {grid[CONF_ROWS]} rows), "
+            f"got {len(grid[CONF_MEASURED])}"
+        )
+    return grid
+
+
+def trigger_automation(*args):
+    """Single automation backed by a Trigger<args...> created in to_code."""
+    return automation.validate_automation(
+        {cv.GenerateID(CONF_TRIGGER_ID): cv.declare_id(automation.Trigger.template(*args))},
+        single=True,
+    )
 
-CONFIG_SCHEMA = touchscreen.TOUCHSCREEN_SCHEMA.extend({
+
+def validate_pressure(config):
+    if CONF_RELEASE_PRESSURE not in config:
+        return config
+    if CONF_MIN_PRESSURE not in config:
+        raise cv.Invalid(f"{CONF_RELEASE_PRESSURE} needs {CONF_MIN_PRESSURE}")
+    if config[CONF_RELEASE_PRESSURE] > config[CONF_MIN_PRESSURE]:
+        raise cv.Invalid(f"{CONF_RELEASE_PRESSURE} must not be above {CONF_MIN_PRESSURE}")
+    return config
+
+
+def validate_gestures(config):
+    if config[CONF_MAX_TOUCHES] < 2:
+        for key in (CONF_ON_PINCH, CONF_ON_ROTATE):
+            if key in config:
+                raise cv.Invalid(f"{key} needs {CONF_MAX_TOUCHES} of at least 2")
+    if CONF_TAP_MAX_DURATION not in config:
+        config[CONF_TAP_MAX_DURATION] = config[CONF_LONG_PRESS_TIME]
+    # A press released between the two would fire neither gesture
+    if (CONF_ON_LONG_PRESS in config or CONF_ON_HOLD_REPEAT in config) and \
+            config[CONF_LONG_PRESS_TIME] > config[CONF_TAP_MAX_DURATION]:
+        raise cv.Invalid(
+            f"{CONF_LONG_PRESS_TIME} must not be above {CONF_TAP_MAX_DURATION}, "
+            f"presses in between would fire nothing"
+        )
+    return config
+
+
+DEBUG_RAW_SCHEMA = cv.Schema({
+    # Log one frame in N (the RAW -> CALIB line per finger)
+    cv.Optional(CONF_EVERY, default=1): cv.int_range(min=1, max=1000),
+    # Skip frames where the point didn't move past movement_deadband
+    cv.Optional(CONF_ON_CHANGE, default=False): cv.boolean,
+    # Frames/s, lines logged and raw x/y range, once a second
+    cv.Optional(CONF_SUMMARY, default=False): cv.boolean,
+})
+
+
+def validate_debug_raw(value):
+    """`debug_raw_touch: true` keeps the old every-frame logging."""
+    if isinstance(value, dict):
+        return DEBUG_RAW_SCHEMA(value)
+    return DEBUG_RAW_SCHEMA({}) if cv.boolean(value) else False
+
+
+LIGHT_SLEEP_SCHEMA = cv.Schema({
+    # Timer wakeup, so the loop and the scheduler still run every
+    # max_duration (idle stages, metrics fire up to that late)
+    cv.Optional(CONF_MAX_DURATION, default="1s"): cv.positive_time_period_milliseconds,
+})
+
+
+def validate_light_sleep(value):
+    """`light_sleep: true` uses the default max_duration."""
+    if isinstance(value, dict):
+        value = LIGHT_SLEEP_SCHEMA(value)
+    elif cv.boolean(value):
+        value = LIGHT_SLEEP_SCHEMA({})
+    else:
+        return False
+    return cv.only_on_esp32(value)
+
+
+IDLE_STAGE_SCHEMA = cv.Schema({
+    # Time since the last touch
+    cv.Required(CONF_TIMEOUT): cv.positive_time_period_milliseconds,
+    cv.Optional(CONF_STATE, default="awake"): cv.enum(IDLE_STATES, lower=True),
+    cv.Optional(CONF_ON_ENTER): trigger_automation(),
+})
+
+
+def validate_idle_stages(config):
+    """`sleep_timeout` is the one-stage shorthand for `idle_stages`."""
+    if CONF_IDLE_STAGES not in config:
+        if CONF_SLEEP_TIMEOUT not in config:
+            config[CONF_SLEEP_TIMEOUT] = cv.positive_time_period_milliseconds(DEFAULT_SLEEP_TIMEOUT)
+        return config
+    if CONF_SLEEP_TIMEOUT in config:
+        raise cv.Invalid(f"{CONF_SLEEP_TIMEOUT} and {CONF_IDLE_STAGES} can't be combined, "
+                         f"use a stage with state: sleep instead")
+    timeouts = [stage[CONF_TIMEOUT] for stage in config[CONF_IDLE_STAGES]]
+    if any(a >= b for a, b in zip(timeouts, timeouts[1:])):
+        raise cv.Invalid(f"{CONF_IDLE_STAGES} timeouts must be increasing")
+    return config
+
+
+SMOOTHING_SCHEMA = cv.Schema({
+    # Cutoff (Hz) while the finger is still: lower = less jitter, more lag
+    cv.Optional(CONF_MIN_CUTOFF, default=1.0): cv.float_range(min=0.01, max=100.0),
+    # Cutoff increase per px/s of speed: higher = less lag on fast moves
+    cv.Optional(CONF_BETA, default=0.007): cv.float_range(min=0.0, max=10.0),
+    cv.Optional(CONF_DERIVATIVE_CUTOFF, default=1.0): cv.float_range(min=0.01, max=100.0),
+})
+
+METRIC_SENSOR_SCHEMA = sensor.sensor_schema(
+    unit_of_measurement=UNIT_MICROSECOND,
+    icon="mdi:timer-outline",
+    accuracy_decimals=0,
+    state_class=STATE_CLASS_MEASUREMENT,
+    entity_category=ENTITY_CATEGORY_DIAGNOSTIC,
+)
+
+# Each stage takes any of min / avg / max / p99 as a sensor
+METRICS_SCHEMA = cv.Schema({
+    cv.Optional(CONF_UPDATE_INTERVAL, default="10s"): cv.positive_time_period_milliseconds,
+    **{
+        cv.Optional(stage): cv.Schema({cv.Optional(stat): METRIC_SENSOR_SCHEMA for stat in METRIC_STATS})
+        for stage in METRIC_STAGES
+    },
+})
+
+XY_PAIR = cv.All(cv.ensure_list(cv.float_), cv.Length(min=2, max=2))
+
+CALIBRATION_POINT_SCHEMA = cv.Schema({
+    cv.Required(CONF_RAW): XY_PAIR,
+    cv.Required(CONF_SCREEN): XY_PAIR,
+})
+
+CALIBRATION_GRID_SCHEMA = cv.All(cv.Schema({
+    cv.GenerateID(CONF_GRID_DATA_ID): cv.declare_id(cg.int16),
+    cv.Required(CONF_COLUMNS): cv.int_range(min=2, max=32),
+    cv.Required(CONF_ROWS): cv.int_range(min=2, max=32),
+    cv.Required(CONF_MEASURED): cv.ensure_list(XY_PAIR),
+}), validate_calibration_grid)
+
+
+CONFIG_SCHEMA = cv.All(touchscreen.TOUCHSCREEN_SCHEMA.extend({
     cv.GenerateID(): cv.declare_id(SmartTouchComponent),
     cv.Required(CONF_SOURCE): cv.use_id(touchscreen.Touchscreen),
     
@@ -37,23 +485,160 @@ CONFIG_SCHEMA = touchscreen.TOUCHSCREEN_SCHEMA.extend({
     cv.Required(CONF_DISPLAY_HEIGHT): cv.int_,
 
     # Power Management
-    cv.Optional(CONF_SLEEP_TIMEOUT, default="30s"): cv.positive_time_period_milliseconds,
+    cv.Optional(CONF_SLEEP_TIMEOUT): cv.positive_time_period_milliseconds,
+    # Idle timeline, e.g. dim at 15s, sleep at 60s, controller_off at 10min.
+    # A touch after any stage restarts it and fires on_wake.
+    cv.Optional(CONF_IDLE_STAGES): cv.All(cv.ensure_list(IDLE_STAGE_SCHEMA), cv.Length(min=1)),
     cv.Optional(CONF_SUPPRESS_WAKE_CLICK, default=True): cv.boolean,
+    # Hard sleep: poll the source this rarely while asleep, or `never` to stop
+    # its I2C polling and wake on the controller's interrupt_pin
+    cv.Optional(CONF_SLEEP_UPDATE_INTERVAL): cv.update_interval,
+    # controller: I2C sleep command on sleep (or at controller_off stages),
+    # reset through the source's reset_pin on wake (touches no longer wake
+    # the panel, use sentio.wake). auto only allows controller_off stages
+    # when the source is a GT911 or CST816 with a reset_pin, plain sleep
+    # stays soft.
+    cv.Optional(CONF_SLEEP_STRATEGY, default="auto"): cv.one_of(*SLEEP_STRATEGIES, lower=True),
+    # ESP32 light sleep while asleep, woken by the source's interrupt_pin
+    cv.Optional(CONF_LIGHT_SLEEP, default=False): validate_light_sleep,
 
     # Calibration
     cv.Optional(CONF_SWAP_XY, default=False): cv.boolean,
     cv.Optional(CONF_INVERT_X, default=False): cv.boolean,
     cv.Optional(CONF_INVERT_Y, default=False): cv.boolean,
+    # Extra affine transform [a, b, c, d, e, f] applied after swap/invert:
+    # x' = a*x + b*y + c, y' = d*x + e*y + f (rotation, scale, offset, skew)
+    cv.Optional(CONF_CALIBRATION_MATRIX): validate_calibration_matrix,
+    # Raw <-> screen reference pairs (3 or more), solved by least squares
+    cv.Optional(CONF_CALIBRATION_POINTS): cv.All(cv.ensure_list(CALIBRATION_POINT_SCHEMA), cv.Length(min=3)),
+    # Nonlinear edge correction: measured grid, bilinear lookup from flash
+    cv.Optional(CONF_CALIBRATION_GRID): CALIBRATION_GRID_SCHEMA,
     cv.Optional(CONF_DEBOUNCE_THRESHOLD, default="20ms"): cv.positive_time_period_milliseconds,
-    cv.Optional(CONF_DEBUG_RAW, default=False): cv.boolean,
+    # hold: touches reach consumers only after debounce_threshold (the latency budget)
+    cv.Optional(CONF_DEBOUNCE_MODE, default="hold"): cv.enum(DEBOUNCE_MODES, lower=True),
+    # Points within this radius (px) of the last published one are not
+    # republished, so consumers only redraw on real movement
+    cv.Optional(CONF_MOVEMENT_DEADBAND, default=0): cv.int_range(min=0, max=255),
+    # Publish moves at most this often (match the LVGL refresh), merging the
+    # samples in between; presses and releases are never delayed
+    cv.Optional(CONF_MAX_REPORT_RATE): cv.All(cv.frequency, cv.Range(min=1.0, max=1000.0)),
+    cv.Optional(CONF_REPORT_MODE, default="latest"): cv.enum(REPORT_MODES, lower=True),
+    # Pressure gate (resistive panels): touches start at min_pressure and last
+    # until they drop below release_pressure (defaults to min_pressure)
+    cv.Optional(CONF_MIN_PRESSURE): cv.int_range(min=1, max=65535),
+    cv.Optional(CONF_RELEASE_PRESSURE): cv.int_range(min=1, max=65535),
+    # Median of the last 3 or 5 raw samples per finger (spike rejection)
+    cv.Optional(CONF_MEDIAN_FILTER): cv.one_of(3, 5, int=True),
+    # One-Euro jitter filter on calibrated coordinates
+    cv.Optional(CONF_SMOOTHING): SMOOTHING_SCHEMA,
+    cv.Optional(CONF_DEBUG_RAW, default=False): validate_debug_raw,
+    # Binary recorder of raw + calibrated frames (16 bytes each), dumped by
+    # the sentio.dump_trace action and decoded with bench/decode_trace.py
+    cv.Optional(CONF_TRACE_BUFFER_SIZE): cv.int_range(min=16, max=4096),
+    # Per-stage micros() timings as sensors, compiled out when not configured
+    cv.Optional(CONF_METRICS): METRICS_SCHEMA,
+
+    # Processing: poll the source every loop, or wait for it to report
+    cv.Optional(CONF_UPDATE_MODE, default="poll"): cv.enum(UPDATE_MODES, lower=True),
+
+    # Touch ids processed per frame (GT911 reports up to 5)
+    cv.Optional(CONF_MAX_TOUCHES, default=1): cv.int_range(min=1, max=10),
+    # Recent calibrated samples kept for lambdas (11 bytes each)
+    cv.Optional(CONF_HISTORY_SIZE, default=16): cv.int_range(min=2, max=255),
 
     # Gestures
-    cv.Optional(CONF_ON_SWIPE_LEFT): automation.validate_automation(single=True),
-    cv.Optional(CONF_ON_SWIPE_RIGHT): automation.validate_automation(single=True),
-    cv.Optional(CONF_ON_TAP): automation.validate_automation(single=True),
-    cv.Optional(CONF_ON_WAKE): automation.validate_automation(single=True),
-    cv.Optional(CONF_ON_SLEEP): automation.validate_automation(single=True),
-}).extend(cv.COMPONENT_SCHEMA)
+    cv.Optional(CONF_SWIPE_THRESHOLD, default=30): cv.int_range(min=1),
+    # Swipes slower than this (px/s) are treated as scrolls, 0 disables
+    cv.Optional(CONF_SWIPE_MIN_VELOCITY, default=0): cv.int_range(min=0),
+    # Dominant axis must exceed the other by this factor (axis lock)
+    cv.Optional(CONF_SWIPE_AXIS_RATIO, default=1.0): cv.float_range(min=1.0, max=16.0),
+    # Defaults to long_press_time, so every still press is a tap or a long press
+    cv.Optional(CONF_TAP_MAX_DURATION): cv.positive_time_period_milliseconds,
+    cv.Optional(CONF_LONG_PRESS_TIME, default="800ms"): cv.positive_time_period_milliseconds,
+    cv.Optional(CONF_HOLD_REPEAT_INTERVAL, default="200ms"): cv.positive_time_period_milliseconds,
+    # With on_double_tap set, on_tap waits this long for a second tap
+    cv.Optional(CONF_DOUBLE_TAP_WINDOW, default="300ms"): cv.positive_time_period_milliseconds,
+    cv.Optional(CONF_ON_SWIPE_LEFT): trigger_automation(),
+    cv.Optional(CONF_ON_SWIPE_RIGHT): trigger_automation(),
+    cv.Optional(CONF_ON_SWIPE_UP): trigger_automation(),
+    cv.Optional(CONF_ON_SWIPE_DOWN): trigger_automation(),
+    cv.Optional(CONF_ON_TAP): trigger_automation(),
+    cv.Optional(CONF_ON_DOUBLE_TAP): trigger_automation(),
+    cv.Optional(CONF_ON_LONG_PRESS): trigger_automation(),
+    cv.Optional(CONF_ON_HOLD_REPEAT): trigger_automation(),
+    cv.Optional(CONF_ON_WAKE): trigger_automation(),
+    cv.Optional(CONF_ON_SLEEP): trigger_automation(),
+    # Two-finger gestures: `scale` is Q8 (256 = 1.0x), `angle` is 0.1 degree
+    cv.Optional(CONF_ON_PINCH): trigger_automation(cg.int32),
+    cv.Optional(CONF_ON_ROTATE): trigger_automation(cg.int32),
+}).extend(cv.COMPONENT_SCHEMA),
+    validate_gestures,
+    validate_pressure,
+    cv.has_at_most_one_key(CONF_CALIBRATION_MATRIX, CONF_CALIBRATION_POINTS),
+    validate_calibration,
+    validate_idle_stages,
+)
+
+def find_source(full_config, config):
+    for source in full_config.get("touchscreen", []):
+        if source[CONF_ID] == config[CONF_SOURCE]:
+            return source
+    return {}
+
+
+def sleep_controller(full_config, config):
+    # The controller sleep command to use, None for soft sleep. Without RST
+    # on the source a sleeping controller can't be woken again.
+    source = find_source(full_config, config)
+    if config[CONF_SLEEP_STRATEGY] == "soft" or CONF_RESET_PIN not in source:
+        return None
+    return SLEEP_CONTROLLERS.get(source.get(CONF_PLATFORM))
+
+
+def final_validate(config):
+    full_config = fv.full_config.get()
+    source = find_source(full_config, config)
+    if config[CONF_SLEEP_STRATEGY] == "controller" and CONF_RESET_PIN not in source:
+        raise cv.Invalid(
+            f"{CONF_SLEEP_STRATEGY}: controller needs a {CONF_RESET_PIN} on touchscreen "
+            f"'{config[CONF_SOURCE]}'"
+        )
+    if config[CONF_SLEEP_STRATEGY] == "controller" and sleep_controller(full_config, config) is None:
+        raise cv.Invalid(
+            f"{CONF_SLEEP_STRATEGY}: controller supports {', '.join(SLEEP_CONTROLLERS)} "
+            f"sources, not '{source.get(CONF_PLATFORM)}'"
+        )
+    controller_stages = [
+        stage for stage in config.get(CONF_IDLE_STAGES, [])
+        if stage[CONF_STATE] == "controller_off"
+    ]
+    if controller_stages and sleep_controller(full_config, config) is None:
+        raise cv.Invalid(
+            f"{CONF_IDLE_STAGES}: controller_off needs a {CONF_RESET_PIN} on a "
+            f"{' or '.join(SLEEP_CONTROLLERS)} source and {CONF_SLEEP_STRATEGY} other than soft"
+        )
+    # With polling stopped only the source's interrupt can wake the panel
+    if config.get(CONF_SLEEP_UPDATE_INTERVAL) == SCHEDULER_DONT_RUN and CONF_INTERRUPT_PIN not in source:
+        raise cv.Invalid(
+            f"{CONF_SLEEP_UPDATE_INTERVAL}: never needs an interrupt_pin on touchscreen "
+            f"'{config[CONF_SOURCE]}', otherwise nothing wakes it"
+        )
+    # A manual light sleep powers the radio down, ESP-IDF doesn't keep the
+    # connection alive through it
+    radios = [name for name in LIGHT_SLEEP_CONFLICTS if name in full_config]
+    if config[CONF_LIGHT_SLEEP] and radios:
+        raise cv.Invalid(
+            f"{CONF_LIGHT_SLEEP} drops the radio while asleep, it can't be combined "
+            f"with {', '.join(radios)}"
+        )
+    if config[CONF_LIGHT_SLEEP] and CONF_INTERRUPT_PIN not in source:
+        raise cv.Invalid(
+            f"{CONF_LIGHT_SLEEP} wakes on the interrupt_pin of touchscreen "
+            f"'{config[CONF_SOURCE]}', which has none"
+        )
+    return config
+
+FINAL_VALIDATE_SCHEMA = final_validate
 
 async def to_code(config):
     var = cg.new_Pvariable(config[CONF_ID])
@@ -64,20 +649,147 @@ async def to_code(config):
     cg.add(var.set_source_driver(source))
 
     # Set Configuration
-    cg.add(var.set_resolution(config[CONF_DISPLAY_WIDTH], config[CONF_DISPLAY_HEIGHT]))
-    cg.add(var.set_sleep_timeout(config[CONF_SLEEP_TIMEOUT]))
     cg.add(var.set_suppress_wake_click(config[CONF_SUPPRESS_WAKE_CLICK]))
-    cg.add(var.set_calibration(config[CONF_SWAP_XY], config[CONF_INVERT_X], config[CONF_INVERT_Y]))
+    if CONF_SLEEP_UPDATE_INTERVAL in config:
+        cg.add(var.set_sleep_update_interval(config[CONF_SLEEP_UPDATE_INTERVAL]))
+    controller = sleep_controller(CORE.config, config)
+    if controller is not None:
+        # The source is passed as its I2C device to send the sleep command.
+        # Its reset_pin (and interrupt_pin, to strap the GT911's address)
+        # are the source's own pin objects, driven only during the wake reset.
+        cg.add_define("USE_SENTIO_CONTROLLER_SLEEP")
+        source_config = find_source(CORE.config, config)
+        reset_pin = await cg.get_variable(source_config[CONF_RESET_PIN][CONF_ID])
+        cg.add(var.set_sleep_controller(controller, source, reset_pin))
+        if CONF_INTERRUPT_PIN in source_config:
+            interrupt_pin = await cg.get_variable(source_config[CONF_INTERRUPT_PIN][CONF_ID])
+            cg.add(var.set_controller_interrupt_pin(interrupt_pin))
+    # Idle timeline: a bare sleep_timeout is a single sleep stage, which only
+    # turns the controller off when sleep_strategy is controller
+    if CONF_IDLE_STAGES in config:
+        for stage in config[CONF_IDLE_STAGES]:
+            if CONF_ON_ENTER in stage:
+                trigger = cg.new_Pvariable(stage[CONF_ON_ENTER][CONF_TRIGGER_ID])
+                await automation.build_automation(trigger, [], stage[CONF_ON_ENTER])
+                cg.add(var.add_idle_stage(stage[CONF_TIMEOUT], stage[CONF_STATE], trigger))
+            else:
+                cg.add(var.add_idle_stage(stage[CONF_TIMEOUT], stage[CONF_STATE]))
+    else:
+        controller_off = config[CONF_SLEEP_STRATEGY] == "controller"
+        state = IDLE_STATES["controller_off" if controller_off else "sleep"]
+        cg.add(var.add_idle_stage(config[CONF_SLEEP_TIMEOUT], state))
+    if config[CONF_LIGHT_SLEEP]:
+        interrupt_pin = find_source(CORE.config, config)[CONF_INTERRUPT_PIN]
+        cg.add_define("USE_SENTIO_LIGHT_SLEEP")
+        cg.add(var.set_light_sleep(interrupt_pin[CONF_NUMBER], config[CONF_LIGHT_SLEEP][CONF_MAX_DURATION]))
+
+    # Calibration: resolved once here, the runtime only does the multiply-add
+    matrix, width, height = orientation_matrix(config)
+    if CONF_CALIBRATION_MATRIX in config:
+        m = config[CONF_CALIBRATION_MATRIX]
+        matrix = compose([m[0:3], m[3:6]], matrix)
+    elif CONF_CALIBRATION_POINTS in config:
+        matrix, _ = fit_affine(config[CONF_CALIBRATION_POINTS])
+    cg.add(var.set_resolution(width, height))
+    cg.add(var.set_calibration(*to_fixed(matrix)))
+    if CONF_CALIBRATION_GRID in config:
+        grid = config[CONF_CALIBRATION_GRID]
+        offsets = grid_offsets(grid, width, height)
+        grid_data = cg.progmem_array(grid[CONF_GRID_DATA_ID], offsets)
+        cg.add(var.set_calibration_grid(grid_data, grid[CONF_COLUMNS], grid[CONF_ROWS]))
+
+    if CONF_MIN_PRESSURE in config:
+        min_pressure = config[CONF_MIN_PRESSURE]
+        cg.add(var.set_pressure_thresholds(min_pressure, config.get(CONF_RELEASE_PRESSURE, min_pressure)))
+    if CONF_MEDIAN_FILTER in config:
+        cg.add(var.set_median_window(config[CONF_MEDIAN_FILTER]))
+    if CONF_SMOOTHING in config:
+        smoothing = config[CONF_SMOOTHING]
+        # Fixed point on the device: cutoffs in mHz, beta scaled by 1e6
+        cg.add(var.set_smoothing(
+            int(round(smoothing[CONF_MIN_CUTOFF] * 1000)),
+            int(round(smoothing[CONF_BETA] * 1000000)),
+            int(round(smoothing[CONF_DERIVATIVE_CUTOFF] * 1000)),
+        ))
     cg.add(var.set_debounce_threshold(config[CONF_DEBOUNCE_THRESHOLD]))
-    cg.add(var.set_debug_raw(config[CONF_DEBUG_RAW]))
+    cg.add(var.set_debounce_mode(config[CONF_DEBOUNCE_MODE]))
+    cg.add(var.set_movement_deadband(config[CONF_MOVEMENT_DEADBAND]))
+    if CONF_MAX_REPORT_RATE in config:
+        cg.add(var.set_report_interval(int(round(1000 / config[CONF_MAX_REPORT_RATE]))))
+    cg.add(var.set_report_mode(config[CONF_REPORT_MODE]))
+    cg.add(var.set_swipe_threshold(config[CONF_SWIPE_THRESHOLD]))
+    cg.add(var.set_swipe_min_velocity(config[CONF_SWIPE_MIN_VELOCITY]))
+    cg.add(var.set_swipe_axis_ratio(int(round(config[CONF_SWIPE_AXIS_RATIO] * 256))))
+    cg.add(var.set_tap_max_duration(config[CONF_TAP_MAX_DURATION]))
+    cg.add(var.set_long_press_time(config[CONF_LONG_PRESS_TIME]))
+    cg.add(var.set_hold_repeat_interval(config[CONF_HOLD_REPEAT_INTERVAL]))
+    cg.add(var.set_double_tap_window(config[CONF_DOUBLE_TAP_WINDOW]))
+    cg.add(var.set_update_mode(config[CONF_UPDATE_MODE]))
+    # Sizes the fixed per-id slot array and the history ring
+    cg.add_define("SENTIO_MAX_TOUCHES", config[CONF_MAX_TOUCHES])
+    cg.add_define("SENTIO_HISTORY_SIZE", config[CONF_HISTORY_SIZE])
+
+    # Stages this config doesn't use are compiled out of Sentio.cpp
+    if any(key in config for key in SINGLE_TOUCH_GESTURES):
+        cg.add_define("USE_SENTIO_GESTURES")
+    if CONF_ON_PINCH in config or CONF_ON_ROTATE in config:
+        cg.add_define("USE_SENTIO_MULTI_TOUCH")
+    if config[CONF_SUPPRESS_WAKE_CLICK]:
+        cg.add_define("USE_SENTIO_WAKE_SUPPRESSION")
+    if config[CONF_DEBUG_RAW]:
+        debug_raw = config[CONF_DEBUG_RAW]
+        cg.add_define("USE_SENTIO_DEBUG_RAW")
+        cg.add(var.set_debug_raw(debug_raw[CONF_EVERY], debug_raw[CONF_ON_CHANGE], debug_raw[CONF_SUMMARY]))
+    if CONF_TRACE_BUFFER_SIZE in config:
+        cg.add_define("USE_SENTIO_TRACE")
+        cg.add_define("SENTIO_TRACE_SIZE", config[CONF_TRACE_BUFFER_SIZE])
+
+    if CONF_METRICS in config:
+        metrics = config[CONF_METRICS]
+        cg.add_define("USE_SENTIO_METRICS")
+        cg.add(var.set_metrics_interval(metrics[CONF_UPDATE_INTERVAL]))
+        for stage, stage_enum in METRIC_STAGES.items():
+            for stat, stat_enum in METRIC_STATS.items():
+                if stat in metrics.get(stage, {}):
+                    sens = await sensor.new_sensor(metrics[stage][stat])
+                    cg.add(var.set_metric_sensor(stage_enum, stat_enum, sens))
 
     # Register Triggers
-    for conf, trigger_fn in [
-        (CONF_ON_SWIPE_LEFT, var.set_on_swipe_left),
-        (CONF_ON_SWIPE_RIGHT, var.set_on_swipe_right),
-        (CONF_ON_TAP, var.set_on_tap),
-        (CONF_ON_WAKE, var.set_on_wake),
-        (CONF_ON_SLEEP, var.set_on_sleep),
+    for conf, trigger_fn, args in [
+        (CONF_ON_SWIPE_LEFT, var.set_on_swipe_left, []),
+        (CONF_ON_SWIPE_RIGHT, var.set_on_swipe_right, []),
+        (CONF_ON_SWIPE_UP, var.set_on_swipe_up, []),
+        (CONF_ON_SWIPE_DOWN, var.set_on_swipe_down, []),
+        (CONF_ON_TAP, var.set_on_tap, []),
+        (CONF_ON_DOUBLE_TAP, var.set_on_double_tap, []),
+        (CONF_ON_LONG_PRESS, var.set_on_long_press, []),
+        (CONF_ON_HOLD_REPEAT, var.set_on_hold_repeat, []),
+        (CONF_ON_WAKE, var.set_on_wake, []),
+        (CONF_ON_SLEEP, var.set_on_sleep, []),
+        (CONF_ON_PINCH, var.set_on_pinch, [(cg.int32, "scale")]),
+        (CONF_ON_ROTATE, var.set_on_rotate, [(cg.int32, "angle")]),
     ]:
         if conf in config:
-            await cv.automation.build_automation(var.get_trigger(conf), [], config[conf])
+            trigger = cg.new_Pvariable(config[conf][CONF_TRIGGER_ID])
+            cg.add(trigger_fn(trigger))
+            await automation.build_automation(trigger, args, config[conf])
+
+
+@automation.register_action(
+    "sentio.dump_trace",
+    DumpTraceAction,
+    cv.Schema({cv.GenerateID(): cv.use_id(SmartTouchComponent)}),
+)
+async def dump_trace_to_code(config, action_id, template_arg, args):
+    parent = await cg.get_variable(config[CONF_ID])
+    return cg.new_Pvariable(action_id, template_arg, parent)
+
+
+@automation.register_action(
+    "sentio.wake",
+    WakeAction,
+    cv.Schema({cv.GenerateID(): cv.use_id(SmartTouchComponent)}),
+)
+async def wake_to_code(config, action_id, template_arg, args):
+    parent = await cg.get_variable(config[CONF_ID])
+    return cg.new_Pvariable(action_id, template_arg, parent)